@@ -0,0 +1,145 @@
+import time
+from queue import Queue
+from threading import Lock, Thread
+
+
+class PlaysoundBackend:
+    """Play files with playsound, which decodes the file on every play; the fallback when
+    pydub or simpleaudio (see requirements.txt) is missing."""
+
+    def load(self, sounds):
+        self.sounds = dict(sounds)
+
+    def play(self, name):
+        from playsound import playsound
+
+        playsound(self.sounds[name])
+
+
+class SimpleAudioBackend:
+    """Decode every sound once with pydub and play the PCM buffers with simpleaudio."""
+
+    def load(self, sounds):
+        from pydub import AudioSegment
+
+        self.segments = {name: AudioSegment.from_file(path) for name, path in sounds.items()}
+
+    def play(self, name):
+        import simpleaudio
+
+        segment = self.segments[name]
+        simpleaudio.play_buffer(
+            segment.raw_data, segment.channels, segment.sample_width, segment.frame_rate
+        ).wait_done()
+
+
+class RecordingBackend:
+    """Play nothing and remember which alerts fired, for tests and headless runs."""
+
+    def __init__(self):
+        self.played = []
+
+    def load(self, sounds):
+        self.sounds = dict(sounds)
+
+    def play(self, name):
+        self.played.append((time.monotonic(), name))
+
+
+def default_backend():
+    """Prefer pre-decoded playback when pydub and simpleaudio are installed."""
+    try:
+        import pydub  # noqa: F401
+        import simpleaudio  # noqa: F401
+    except ImportError as e:
+        print(f"Alert sounds fall back to playsound and are decoded on every play ({e}); "
+              f"install pydub and simpleaudio from requirements.txt to decode them once.")
+        return PlaysoundBackend()
+    return SimpleAudioBackend()
+
+
+class AudioDispatcher:
+    """Play alert sounds asynchronously from a single worker thread.
+
+    Requests for a sound that is already queued are dropped, and each sound can be
+    rate-limited so a repeated warning plays at most once per interval.
+    """
+
+    SOUNDS = {
+        "warning": "sounds/warning.mp3",
+        "work": "sounds/work.mp3",
+        "rest": "sounds/rest.mp3",
+    }
+    MIN_INTERVALS = {
+        "warning": 10.0,
+    }
+
+    _shared = None
+    _shared_lock = Lock()
+
+    def __init__(self, backend=None, sounds=None, min_intervals=None):
+        self.backend = backend if backend is not None else default_backend()
+        self.sounds = dict(sounds if sounds is not None else self.SOUNDS)
+        self.min_intervals = dict(min_intervals if min_intervals is not None else self.MIN_INTERVALS)
+        self.queue = Queue()
+        self.lock = Lock()
+        self.pending = set()
+        self.last_played = {}
+        self.requested = 0
+        self.suppressed = 0
+        self.worker = Thread(target=self.worker_loop, daemon=True)
+        self.worker.start()
+
+    @staticmethod
+    def shared():
+        """Return the process-wide dispatcher, creating it on first use."""
+        with AudioDispatcher._shared_lock:
+            if AudioDispatcher._shared is None:
+                AudioDispatcher._shared = AudioDispatcher()
+            return AudioDispatcher._shared
+
+    @staticmethod
+    def use(dispatcher):
+        """Replace the process-wide dispatcher, e.g. with one using RecordingBackend."""
+        with AudioDispatcher._shared_lock:
+            AudioDispatcher._shared = dispatcher
+
+    def play(self, name):
+        """Queue a sound without blocking; return False if it was de-duplicated or rate-limited."""
+        now = time.monotonic()
+        with self.lock:
+            self.requested += 1
+            last = self.last_played.get(name)
+            interval = self.min_intervals.get(name, 0.0)
+            if name in self.pending or (last is not None and now - last < interval):
+                self.suppressed += 1
+                return False
+            self.pending.add(name)
+            self.last_played[name] = now
+        self.queue.put(name)
+        return True
+
+    def worker_loop(self):
+        try:
+            self.backend.load(self.sounds)
+        except Exception as e:
+            print(f"Error loading alert sounds: {e}")
+            self.backend = RecordingBackend()
+            self.backend.load(self.sounds)
+
+        while True:
+            name = self.queue.get()
+            if name is None:
+                break
+            try:
+                self.backend.play(name)
+            except Exception as e:
+                print(f"Error playing sound '{name}': {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard(name)
+
+    def close(self):
+        """Stop the worker once queued sounds have played."""
+        self.queue.put(None)
+        self.worker.join(timeout=5.0)
@@ -0,0 +1,88 @@
+"""Deterministic synthetic inputs for the benchmark suite; nothing here needs a camera."""
+import base64
+import io
+import json
+
+import numpy as np
+
+# Eye contour of the 68-point model, left eye then right eye, for a wide-open eye.
+OPEN_EYE = np.array([[0, 0], [10, -5], [20, -5], [30, 0], [20, 5], [10, 5]], dtype=np.float64)
+
+
+def landmark_sets(count, seed=0):
+    """(count, 68, 2) landmark arrays whose eyes open and close over time."""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.uniform(0, 480, size=(count, 68, 2))
+    openness = 0.2 + 0.8 * np.abs(np.sin(np.linspace(0, 20 * np.pi, count)))
+    for offset, start in ((200.0, 36), (260.0, 42)):
+        eye = np.repeat(OPEN_EYE[None], count, axis=0)
+        eye[:, :, 1] *= openness[:, None]
+        eye += offset + rng.normal(0, 0.3, size=eye.shape)
+        landmarks[:, start:start + 6] = eye
+    return landmarks
+
+
+def ear_series(count, fps=30.0, seed=0):
+    """Per-frame EAR with blinks every ~4 s and a drowsy stretch in the last quarter."""
+    rng = np.random.default_rng(seed)
+    ears = rng.normal(0.3, 0.01, count)
+    blink_every = int(4 * fps)
+    for start in range(blink_every, count, blink_every):
+        ears[start:start + 5] = 0.12
+    ears[int(count * 0.75):] -= 0.1 * (np.arange(count - int(count * 0.75)) % 90 < 40)
+    return ears
+
+
+def gray_frames(count, width=640, height=480, seed=0):
+    """Noisy grayscale frames with a bright face-like ellipse that drifts across the image."""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width]
+    frames = []
+    for index in range(count):
+        frame = rng.integers(40, 80, size=(height, width), dtype=np.uint8)
+        cx = width / 2 + 40 * np.sin(index / 15)
+        cy = height / 2 + 20 * np.cos(index / 20)
+        face = ((xs - cx) / 110) ** 2 + ((ys - cy) / 150) ** 2 <= 1
+        frame[face] = 170
+        frames.append(frame)
+    return frames
+
+
+def window_switches(count, apps=8, titles_per_app=300, seed=0):
+    """Scripted (seconds since start, app, title) switches with unbounded-looking titles."""
+    rng = np.random.default_rng(seed)
+    offsets = np.cumsum(rng.exponential(20.0, count))
+    app_ids = rng.integers(0, apps, count)
+    title_ids = rng.zipf(1.3, count) % titles_per_app
+    return [
+        (float(offset), f"App {app}", f"Document {title}.txt")
+        for offset, app, title in zip(offsets, app_ids, title_ids)
+    ]
+
+
+def usage_intervals(count, apps=40, days=30, seed=0):
+    """Back-to-back (starts, ends, app codes) usage intervals spread over `days` days."""
+    rng = np.random.default_rng(seed)
+    starts = 1_700_000_000.0 + np.sort(rng.random(count)) * days * 86400
+    ends = np.append(starts[1:], starts[-1] + 1.0)
+    return starts, ends, rng.integers(0, apps, count)
+
+
+def exercise_payload(count, width=1200, height=900, seed=0):
+    """JSON text shaped like the /exercises/random response, with base64 JPEG images."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    exercises = []
+    for index in range(count):
+        pixels = rng.integers(0, 255, size=(height // 8, width // 8, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels).resize((width, height))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        exercises.append({
+            "id": index,
+            "name": f"Exercise {index}",
+            "description": "Stretch slowly and hold for ten seconds.",
+            "image": base64.b64encode(buffer.getvalue()).decode("ascii"),
+        })
+    return json.dumps(exercises)
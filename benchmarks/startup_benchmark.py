@@ -0,0 +1,93 @@
+"""Measure how long program.py takes to import and to show its first window.
+
+Time to first frame launches program.py itself in a fresh interpreter and stops the
+clock when its Tk root window is mapped. Run from the repository root (needs a display):
+
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = "import counter.counter"
+
+# Runs program.py unchanged; the only addition is a <Map> binding on every Tk root,
+# which reports the first mapping and ends the process.
+FIRST_FRAME_SNIPPET = """
+import os
+import runpy
+import sys
+import tkinter
+
+tk_init = tkinter.Tk.__init__
+
+
+def init(self, *args, **kwargs):
+    tk_init(self, *args, **kwargs)
+
+    def on_map(event):
+        if event.widget is self:
+            print("FIRST_FRAME", flush=True)
+            os._exit(0)
+
+    self.bind("<Map>", on_map, add="+")
+
+
+tkinter.Tk.__init__ = init
+sys.argv = ["program.py"]
+runpy.run_path("program.py", run_name="__main__")
+"""
+
+DETECTOR_SNIPPET = """
+from eyesdetection.FatigueDetection import FatigueDetection
+
+FatigueDetection.load_models()
+"""
+
+
+def time_process(snippet):
+    """Seconds from launching a fresh interpreter until the snippet exits."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", snippet], check=True)
+    return time.perf_counter() - start
+
+
+def time_to_first_frame():
+    """Seconds from launching program.py until its main window is mapped."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", FIRST_FRAME_SNIPPET], stdout=subprocess.PIPE, text=True)
+    elapsed = None
+    for line in process.stdout:
+        if line.strip() == "FIRST_FRAME":
+            elapsed = time.perf_counter() - start
+            break
+    process.wait()
+    if elapsed is None:
+        raise RuntimeError("The window was never mapped")
+    return elapsed
+
+
+def report(name, samples):
+    print(f"{name:<28} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-window", action="store_true", help="Only measure imports (no display needed)")
+    parser.add_argument("--detector", action="store_true", help="Also time loading the landmark model")
+    args = parser.parse_args()
+
+    report("interpreter startup", [time_process("pass") for _ in range(args.runs)])
+    report("import counter.counter", [time_process(IMPORT_SNIPPET) for _ in range(args.runs)])
+    if args.detector:
+        report("detector model load", [time_process(DETECTOR_SNIPPET) for _ in range(args.runs)])
+    if not args.skip_window:
+        report("time to first frame", [time_to_first_frame() for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Headless benchmark suite for the detection, tracking, analytics and UI data paths.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                      # run and print
+    python -m benchmarks.suite --save               # store results as the baseline
+    python -m benchmarks.suite --compare            # fail if slower than the baseline
+    python -m benchmarks.suite --only ear,tracking  # run a subset
+
+A case regresses when its throughput drops more than --threshold (default 20%)
+below the saved baseline; the process then exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import fixtures
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def measure(operation, items, repeat=3, batch=1):
+    """Run operation(item) for every item, `repeat` times; return throughput and latency stats.
+
+    When each item stands for `batch` operations, results are reported per operation.
+    """
+    best_total = None
+    latencies = []
+    for _ in range(repeat):
+        run_latencies = []
+        start = time.perf_counter()
+        for item in items:
+            item_start = time.perf_counter()
+            operation(item)
+            run_latencies.append(time.perf_counter() - item_start)
+        total = time.perf_counter() - start
+        if best_total is None or total < best_total:
+            best_total = total
+            latencies = run_latencies
+    latencies = np.array(latencies) / batch
+    return {
+        "ops_per_sec": len(items) * batch / best_total if best_total else float("inf"),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def bench_ear():
+    from eyesdetection.backends import EYE_LANDMARKS_68
+    from eyesdetection.FatigueDetection import FatigueDetection
+
+    landmarks = fixtures.landmark_sets(5000)
+    eye_slice = list(EYE_LANDMARKS_68)
+    return measure(
+        lambda points: FatigueDetection.eye_aspect_ratio(points[eye_slice].reshape(2, 6, 2)).mean(),
+        landmarks,
+    )
+
+
+def bench_state_machine():
+    from eyesdetection.FatigueDetection import FatigueDetection
+
+    ears = fixtures.ear_series(20000)
+    timestamps = np.arange(len(ears)) / 30.0
+    alerts_enabled = FatigueDetection.alerts_enabled
+    FatigueDetection.alerts_enabled = False
+    FatigueDetection.ear_history = None
+    try:
+        def run(_):
+            FatigueDetection.reset()
+            for ear, timestamp in zip(ears, timestamps):
+                FatigueDetection.update_state(ear, timestamp)
+
+        return measure(run, [None], repeat=3, batch=len(ears))
+    finally:
+        FatigueDetection.alerts_enabled = alerts_enabled
+
+
+def bench_face_detector(backend_name, scale):
+    from eyesdetection.backends import BACKENDS, DlibBackend, create_backend
+    from eyesdetection.FatigueDetection import FatigueDetection
+
+    if backend_name != DlibBackend.name and not os.path.exists(BACKENDS[backend_name].MODEL_PATH):
+        return None
+    backend = create_backend(backend_name)
+    backend.load_detector()
+    frames = fixtures.gray_frames(30)
+    loaded = FatigueDetection.backend
+    FatigueDetection.backend = backend
+    try:
+        return measure(lambda frame: FatigueDetection.run_detector(frame, scale), frames, repeat=2)
+    finally:
+        FatigueDetection.backend = loaded
+
+
+def bench_process_frame(backend_name):
+    from eyesdetection.backends import BACKENDS
+    from eyesdetection.FatigueDetection import FatigueDetection
+
+    if not all(os.path.exists(path) for path in BACKENDS[backend_name].MODEL_PATHS):
+        return None
+    frames = fixtures.gray_frames(60)
+    FatigueDetection.use_backend(backend_name)
+    FatigueDetection.reset()
+    alerts_enabled = FatigueDetection.alerts_enabled
+    FatigueDetection.alerts_enabled = False
+    try:
+        return measure(lambda frame: FatigueDetection.process_frame(frame, lambda status: None), frames, repeat=2)
+    finally:
+        FatigueDetection.alerts_enabled = alerts_enabled
+
+
+class LandmarkStubBackend:
+    """Face backend stand-in: one fixed face per frame and scripted eye landmarks, so the
+    per-frame path (tracker, EAR, state machine) runs without model files."""
+
+    name = "stub"
+
+    def __init__(self, landmarks):
+        import dlib
+
+        from eyesdetection.backends import EYE_LANDMARKS_68
+
+        self.face = dlib.rectangle(170, 90, 470, 390)
+        self.eyes_per_frame = landmarks[:, list(EYE_LANDMARKS_68)].reshape(-1, 2, 6, 2)
+        self.index = 0
+
+    def detect(self, gray_frame):
+        return [self.face]
+
+    def eyes(self, gray_frame, face):
+        eyes = self.eyes_per_frame[self.index % len(self.eyes_per_frame)]
+        self.index += 1
+        return eyes
+
+
+def bench_process_frame_stub():
+    from eyesdetection.FatigueDetection import FatigueDetection
+
+    frames = fixtures.gray_frames(60) * 10
+    loaded = FatigueDetection.backend
+    FatigueDetection.backend = LandmarkStubBackend(fixtures.landmark_sets(len(frames)))
+    FatigueDetection.reset()
+    alerts_enabled = FatigueDetection.alerts_enabled
+    ear_history = FatigueDetection.ear_history
+    FatigueDetection.alerts_enabled = False
+    FatigueDetection.ear_history = None
+    try:
+        return measure(lambda frame: FatigueDetection.process_frame(frame, lambda status: None), frames, repeat=2)
+    finally:
+        FatigueDetection.backend = loaded
+        FatigueDetection.alerts_enabled = alerts_enabled
+        FatigueDetection.ear_history = ear_history
+        FatigueDetection.reset()
+
+
+def bench_tracking():
+    import contextlib
+    import io
+
+    from counter.program_controll import ProgramController
+    from counter.usage_aggregate import UsageAggregator
+    from counter.usage_store import UsageStore
+    from counter.window_backends import SyntheticBackend
+
+    switches = fixtures.window_switches(5000)
+    with tempfile.TemporaryDirectory() as directory:
+        def run(_):
+            ProgramController.store = UsageStore(os.path.join(directory, f"usage-{time.perf_counter_ns()}.db"))
+            ProgramController.usage_log = UsageAggregator()
+            ProgramController.active_window = None
+            ProgramController.stop_event.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ProgramController.track_active_window(SyntheticBackend(switches, end=switches[-1][0] + 1))
+                ProgramController.stop_tracking()
+            ProgramController.store.close()
+            ProgramController.store = None
+
+        result = measure(run, [None], repeat=3, batch=len(switches))
+    ProgramController.backend = None
+    ProgramController.stop_event.clear()
+    return result
+
+
+def bench_usage_report(period):
+    from counter.usage_analytics import UsageFrame, build_report
+
+    starts, ends, codes = fixtures.usage_intervals(1_000_000)
+    frame = UsageFrame(starts, ends, codes, [f"App {code}" for code in range(40)], starts[0], ends[-1])
+    tired_starts = starts[::5000]
+    tired_ends = tired_starts + 900.0
+    return measure(lambda _: build_report(frame, tired_starts, tired_ends, period), [None],
+                   repeat=3, batch=len(frame))
+
+
+def bench_exercise_images(cached):
+    from counter.exercise_images import ExerciseImageCache
+
+    exercises = json.loads(fixtures.exercise_payload(8))
+    size = (300, 348)
+    cache = ExerciseImageCache(max_entries=len(exercises))
+    if cached:
+        for exercise in exercises:
+            cache.prepare(exercise, size)
+        return measure(lambda exercise: cache.lookup((cache.exercise_key(exercise), size)), exercises * 50)
+    return measure(lambda exercise: cache.render_exercise(exercise, size), exercises, repeat=3)
+
+
+CASES = {
+    "ear": bench_ear,
+    "state_machine": bench_state_machine,
+    "face_detector_full": lambda: bench_face_detector("dlib", 1.0),
+    "face_detector_half": lambda: bench_face_detector("dlib", 0.5),
+    "face_detector_dnn": lambda: bench_face_detector("dnn", 1.0),
+    "process_frame_stub": bench_process_frame_stub,
+    "process_frame": lambda: bench_process_frame("dlib"),
+    "process_frame_dnn": lambda: bench_process_frame("dnn"),
+    "tracking": bench_tracking,
+    "usage_report_daily": lambda: bench_usage_report("day"),
+    "usage_report_hourly": lambda: bench_usage_report("hour"),
+    "exercise_decode_resize": lambda: bench_exercise_images(cached=False),
+    "exercise_cache_hit": lambda: bench_exercise_images(cached=True),
+}
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=None, help="Comma-separated case names")
+    parser.add_argument("--baseline", default=platform.node() or "default", help="Baseline name")
+    parser.add_argument("--save", action="store_true", help="Save results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed throughput drop (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(CASES)
+    baseline = {}
+    if args.compare:
+        try:
+            with open(baseline_path(args.baseline)) as f:
+                baseline = json.load(f)["results"]
+        except OSError:
+            print(f"No baseline '{args.baseline}' to compare against; run with --save first.")
+            return 2
+
+    results = {}
+    regressions = []
+    print(f"{'case':<26}{'ops/sec':>14}{'p50 ms':>10}{'p95 ms':>10}{'vs base':>10}")
+    for name in names:
+        try:
+            result = CASES[name]()
+        except ImportError as e:
+            print(f"{name:<26}skipped ({e})")
+            continue
+        if result is None:
+            print(f"{name:<26}skipped (model file not available)")
+            continue
+        results[name] = result
+        change = ""
+        if name in baseline:
+            ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            if ratio < 1 - args.threshold:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:<26}{result['ops_per_sec']:>14.1f}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{change:>10}")
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.baseline), "w") as f:
+            json.dump({"python": sys.version.split()[0], "machine": platform.platform(), "results": results},
+                      f, indent=2)
+        print(f"Saved baseline '{args.baseline}'.")
+
+    if regressions:
+        print(f"Regressed beyond {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Compare the always-detect and tracking paths of FatigueDetection on recorded footage.
+
+Run from the repository root:
+
+    python -m benchmarks.tracking_benchmark footage.mp4 --redetect-interval 15
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from eyesdetection.FatigueDetection import FatigueDetection
+
+
+def load_gray_frames(video_path, max_frames=None):
+    """Decode the footage once so both runs measure detection only."""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def run_pass(frames, tracking):
+    """Measure EAR for every frame and return (per-frame EAR, frames/sec)."""
+    FatigueDetection.TRACKING_ENABLED = tracking
+    FatigueDetection.reset_tracking()
+    ears = np.full(len(frames), np.nan)
+    start = time.perf_counter()
+    for index, gray_frame in enumerate(frames):
+        measured = FatigueDetection.measure_ear(gray_frame)
+        if measured:
+            ears[index] = measured[0]
+    elapsed = time.perf_counter() - start
+    return ears, len(frames) / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", help="Path to recorded footage")
+    parser.add_argument("--redetect-interval", type=int, default=FatigueDetection.REDETECT_INTERVAL)
+    parser.add_argument("--min-confidence", type=float, default=FatigueDetection.TRACKING_MIN_CONFIDENCE)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--backend", default=None, help="Face/landmark backend (default: FatigueDetection's)")
+    args = parser.parse_args()
+
+    frames = load_gray_frames(args.video, args.max_frames)
+    if not frames:
+        print(f"No frames could be read from {args.video}")
+        return
+
+    if args.backend is not None:
+        FatigueDetection.use_backend(args.backend)
+    FatigueDetection.REDETECT_INTERVAL = args.redetect_interval
+    FatigueDetection.TRACKING_MIN_CONFIDENCE = args.min_confidence
+
+    detect_ears, detect_fps = run_pass(frames, tracking=False)
+    track_ears, track_fps = run_pass(frames, tracking=True)
+
+    both = ~np.isnan(detect_ears) & ~np.isnan(track_ears)
+    diff = np.abs(detect_ears[both] - track_ears[both])
+
+    print(f"Frames:              {len(frames)}")
+    print(f"Always-detect:       {detect_fps:.1f} fps, face in {np.count_nonzero(~np.isnan(detect_ears))} frames")
+    print(f"Tracking:            {track_fps:.1f} fps, face in {np.count_nonzero(~np.isnan(track_ears))} frames")
+    print(f"Speed-up:            {track_fps / detect_fps:.2f}x")
+    if diff.size:
+        print(f"EAR mean abs diff:   {diff.mean():.4f}")
+        print(f"EAR max abs diff:    {diff.max():.4f}")
+        print(f"EAR within 0.02:     {np.mean(diff <= 0.02) * 100:.1f}%")
+        if diff.size > 1:
+            corr = np.corrcoef(detect_ears[both], track_ears[both])[0, 1]
+            print(f"EAR correlation:     {corr:.4f}")
+    else:
+        print("No frames where both paths found a face; EAR agreement unavailable.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,12 @@
-import base64
+import math
 import tkinter as tk
-from io import BytesIO
 from threading import Thread
 
-from PIL import Image, ImageTk
-from matplotlib import pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from playsound import playsound
-
-from counter.execrise import Exercise
-from eyesdetection.FatigueDetection import FatigueDetection
+from audio.dispatcher import AudioDispatcher
+from counter.execrise import ExerciseCatalog
+from counter.exercise_images import ExerciseImageCache
+from counter.session import SessionEngine
+from counter.status_bridge import StatusBridge
 from counter.program_controll import ProgramController
 
 
@@ -22,9 +19,20 @@ class Counter:
     def __init__(self):
         self.window = tk.Tk()
         self.img_counter = 0
-        self.exercise = Exercise().get_exercise()
-        FatigueDetection.start_detection(self.update_fatigue_status)
-        self.total_seconds = 0
+        self.exercise_catalog = ExerciseCatalog()
+        self.exercise = self.exercise_catalog.exercises()
+        self.exercise_images = ExerciseImageCache()
+        self.exercise_image_size = None
+        self.exercise_catalog.add_listener(self.prefetch_exercise_images)
+        self.waiting_for_exercises = False
+        self.exercise_bridge = StatusBridge(self.exercises_loaded)
+        self.exercise_bridge.attach(self.window)
+        self.exercise_catalog.add_listener(self.exercise_bridge.publish)
+        self.status_bridge = StatusBridge(self.update_fatigue_status)
+        self.status_bridge.attach(self.window)
+        Thread(target=self.start_fatigue_detection, daemon=True).start()
+        self.session = None
+        self.countdown_job = None
         self.is_rest = True
         self.ui_elements = {
             "user_status": tk.Label(),
@@ -39,16 +47,17 @@ class Counter:
             "image_label": tk.Label(),
             "image_description": tk.Label(),
             "next_exercise_btn": tk.Button(self.window, text="Next Exercise", command=self.increment_img_counter),
-            "exercise_img": tk.Label(),
+            "exercise_img": tk.Label(self.window),
             "show_stats_btn": tk.Button(),
             "time_label": tk.Label(),
             "back_btn": tk.Button(),
-            "graph_canvas": None
         }
+        self.usage_chart = None
 
         self.window.title("Timer")
         self.window.geometry("500x580")
         self.window.configure(bg='#2c3e50')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
 
         self.start_tracking()
 
@@ -58,18 +67,29 @@ class Counter:
         tracking_thread = Thread(target=ProgramController.track_active_window, daemon=True)
         tracking_thread.start()
 
+    def start_fatigue_detection(self):
+        """Import and start the detector off the main thread so the window appears right away."""
+        from eyesdetection.FatigueDetection import FatigueDetection
+
+        FatigueDetection.start_detection(self.status_bridge.publish)
+
     def update_fatigue_status(self, status):
+        """Apply a changed fatigue status; called on the Tk main thread by the status bridge."""
+        ProgramController.record_fatigue_status(status)
         if status == "Tired":
             self.ui_elements["user_status"].config(text="User is Tired!")
         elif status == "Not Tired":
             self.ui_elements["user_status"].config(text="User is Not Tired!")
         elif status == "Calibrating":
             self.ui_elements["user_status"].config(text="Calibrating...")
-        self.ui_elements["user_status"].grid(row=0, column=4, columnspan=2, pady=10)
+        if not self.ui_elements["user_status"].winfo_manager():
+            self.ui_elements["user_status"].grid(row=0, column=4, columnspan=2, pady=10)
 
 
 
     def increment_img_counter(self):
+        if not self.exercise:
+            return
         if self.img_counter >= len(self.exercise) - 1:
             self.img_counter = 0
         else:
@@ -77,34 +97,15 @@ class Counter:
         self.show_current_exercise()
 
     def show_usage_graph(self):
-        """Create and display the usage graph in the Tkinter window."""
-        if not ProgramController.usage_log:
-            print("No data available for graph.")
-            return
-
-
-        programs = list(ProgramController.usage_log.keys())
-        usage_times = list(ProgramController.usage_log.values())
-
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.barh(programs, usage_times, color="skyblue")
-        ax.set_xlabel("Time (seconds)", fontsize=12)
-        ax.set_ylabel("Programs", fontsize=12)
-        ax.set_title("Program Usage", fontsize=16)
-        plt.tight_layout()
-
-
-        if self.ui_elements["graph_canvas"] is not None:
-            self.ui_elements["graph_canvas"].get_tk_widget().destroy()
-
-
-        self.ui_elements["graph_canvas"] = FigureCanvasTkAgg(fig, master=self.window)
-        self.ui_elements["graph_canvas"].draw()
-        self.ui_elements["graph_canvas"].get_tk_widget().grid(row=5, column=0, columnspan=2, pady=10)
-
-
-        plt.close(fig)
+        """Show the usage chart, creating it once and refreshing it live while it is visible."""
+        from counter.usage_chart import UsageChart
+
+        if self.usage_chart is None:
+            self.usage_chart = UsageChart(self.window, figsize=(8, 4))
+        self.usage_chart.widget().grid(row=5, column=0, columnspan=2, pady=10)
+        self.usage_chart.start_live(
+            lambda: ProgramController.usage_totals(top_n=UsageChart.TOP_N, include_open=True)
+        )
 
     def setup_ui(self):
         self.configure_grid()
@@ -172,61 +173,72 @@ class Counter:
         )
 
     def start_timer(self):
-        """Start the work timer."""
-        hide_elements([
-            self.ui_elements["image_label"],
-            self.ui_elements["image_description"],
-            self.ui_elements["next_exercise_btn"],
-            self.ui_elements["rest_minutes_spinbox"],
-            self.ui_elements["rest_minute_label"],
-            self.ui_elements["rest_confirm_button"],
-            self.ui_elements["exercise_img"],
-        ])
-        self.ui_elements["main_title"].config(text="Work Timer Started!")
-
-
-        if not self.is_rest:
-            hours = int(self.ui_elements["hours_spinbox"].get())
-            minutes = int(self.ui_elements["minutes_spinbox"].get())
-            self.total_seconds = hours * 3600 + minutes * 60
+        """Start the work/rest cycle with the times from the spinboxes."""
+        hours = int(self.ui_elements["hours_spinbox"].get())
+        minutes = int(self.ui_elements["minutes_spinbox"].get())
+        rest_minutes = int(self.ui_elements["rest_minutes_spinbox"].get())
 
         self.show_time_label()
-        self.countdown()
+        self.session = SessionEngine(
+            hours * 3600 + minutes * 60,
+            rest_minutes * 60,
+            on_tick=self.show_remaining_time,
+            on_phase_change=self.change_phase,
+        )
+        self.session.start()
+        self.schedule_countdown(self.session.poll())
+
+    def schedule_countdown(self, delay):
+        """Wake up once, at the session's next deadline."""
+        if self.countdown_job is not None:
+            self.window.after_cancel(self.countdown_job)
+        self.countdown_job = self.window.after(max(1, math.ceil(delay * 1000)), self.countdown)
 
     def countdown(self):
-        """Handle countdown logic for both work and rest phases."""
-        self.total_seconds -= 1
-        if self.total_seconds > 0:
-            hrs, secs = divmod(self.total_seconds, 3600)
-            mins, secs = divmod(secs, 60)
-            self.ui_elements["time_label"].config(text=f"{hrs:02}:{mins:02}:{secs:02}")
-            self.window.after(1000, self.countdown)
-        else:
-            if self.is_rest:
-                hide_elements([
-                    self.ui_elements["image_label"],
-                    self.ui_elements["image_description"],
-                    self.ui_elements["next_exercise_btn"],
-                    self.ui_elements["rest_minutes_spinbox"],
-                    self.ui_elements["rest_minute_label"],
-                    self.ui_elements["rest_confirm_button"],
-                    self.ui_elements["exercise_img"]
-                ])
-                self.is_rest = False
-                playsound('sounds/work.mp3')
+        """Advance the session engine and sleep until its next deadline."""
+        self.countdown_job = None
+        self.schedule_countdown(self.session.poll())
+
+    def show_remaining_time(self, remaining):
+        hrs, secs = divmod(remaining, 3600)
+        mins, secs = divmod(secs, 60)
+        self.ui_elements["time_label"].config(text=f"{hrs:02}:{mins:02}:{secs:02}")
+
+    def change_phase(self, phase):
+        """Switch the UI between the work and rest phases."""
+        if phase == SessionEngine.WORK:
+            hide_elements([
+                self.ui_elements["image_label"],
+                self.ui_elements["image_description"],
+                self.ui_elements["next_exercise_btn"],
+                self.ui_elements["rest_minutes_spinbox"],
+                self.ui_elements["rest_minute_label"],
+                self.ui_elements["rest_confirm_button"],
+                self.ui_elements["exercise_img"]
+            ])
+            self.is_rest = False
+            AudioDispatcher.shared().play("work")
+            if self.session.completed_phases:
                 self.ui_elements["main_title"].config(text="Work Timer Restarted!")
-                self.start_timer()
             else:
+                self.ui_elements["main_title"].config(text="Work Timer Started!")
 
-                self.is_rest = True
-                playsound('sounds/rest.mp3')
-                self.ui_elements["main_title"].config(text="Rest Time!")
-                minutes = int(self.ui_elements["rest_minutes_spinbox"].get())
-                self.total_seconds = minutes * 60
-                self.show_current_exercise()
-                self.countdown()
+            self.waiting_for_exercises = False
+            self.exercise_image_size = self.get_exercise_image_size()
+            self.prefetch_exercise_images(self.exercise_catalog.items)
+            # /random picks a new set each call; fetch one per session rather than per TTL.
+            self.exercise_catalog.prefetch(force=True)
+        else:
+            self.is_rest = True
+            AudioDispatcher.shared().play("rest")
+            self.ui_elements["main_title"].config(text="Rest Time!")
+            self.exercise = self.exercise_catalog.exercises()
+            self.img_counter = 0
+            self.show_current_exercise()
+        self.show_remaining_time(self.session.remaining())
 
     def show_statistics(self):
+        self.waiting_for_exercises = False
         hide_elements([
             self.ui_elements["image_label"],
             self.ui_elements["exercise_img"],
@@ -249,31 +261,56 @@ class Counter:
         self.show_usage_graph()
 
     def exercise_back(self):
-        if self.ui_elements["graph_canvas"] is not None:
-            self.ui_elements["graph_canvas"].get_tk_widget().destroy()
-            self.ui_elements["graph_canvas"] = None
+        if self.usage_chart is not None:
+            self.usage_chart.stop_live()
+            self.usage_chart.widget().grid_forget()
         hide_elements([self.ui_elements["back_btn"]])
         self.create_main_title()
         if self.is_rest:
             self.ui_elements["main_title"].config(text="Rest Time!")
-            self.show_exercise_control_elements()
+            if self.exercise:
+                self.show_exercise_control_elements()
+            else:
+                self.exercise = self.exercise_catalog.exercises()
+                self.show_current_exercise()
         else:
             self.ui_elements["main_title"].config(text="Work Time!")
         self.show_time_label()
 
+    def get_exercise_image_size(self):
+        """Target size of the exercise image: 60% of the current window."""
+        return (
+            max(1, int(self.window.winfo_width() * 0.6)),
+            max(1, int(self.window.winfo_height() * 0.6)),
+        )
+
+    def prefetch_exercise_images(self, exercises):
+        """Pre-render exercise images off the main thread; safe to call from the catalog thread."""
+        if self.exercise_image_size is not None:
+            self.exercise_images.prefetch(exercises, self.exercise_image_size)
+
+    def exercises_loaded(self, exercises):
+        """Show a newly fetched list if the rest screen is waiting for one; runs on the Tk main thread."""
+        if self.waiting_for_exercises and self.is_rest:
+            self.exercise = exercises
+            self.show_current_exercise()
+
     def show_current_exercise(self):
-        self.exercise = Exercise().get_exercise()
-        if self.ui_elements["exercise_img"] is not None:
-            self.ui_elements["exercise_img"].grid_forget()
-            self.ui_elements["exercise_img"] = None
+        if not self.exercise:
+            self.waiting_for_exercises = True
+            self.ui_elements["image_label"].config(
+                text="No exercises available yet.",
+                bg=self.window["bg"],
+                fg="white",
+                font=("Arial", 12))
+            self.ui_elements["image_label"].grid(row=3, column=0, columnspan=2, pady=10)
+            return
+        self.waiting_for_exercises = False
+        self.img_counter %= len(self.exercise)
         cur_exercise = self.exercise[self.img_counter]
-        base64_data = cur_exercise["image"]
 
         try:
-            image_data = base64.b64decode(base64_data)
-            image = Image.open(BytesIO(image_data))
             window_width = self.window.winfo_width()
-            window_height = self.window.winfo_height()
 
             self.ui_elements["image_label"].config(
                 text=cur_exercise["name"],
@@ -293,12 +330,8 @@ class Counter:
             )
             self.ui_elements["image_description"].grid(row=4, column=0, columnspan=2, pady=10)
 
-            new_width = int(window_width * 0.6)
-            new_height = int(window_height * 0.6)
-
-            resized_image = image.resize((new_width, new_height), Image.ADAPTIVE)
-            photo = ImageTk.PhotoImage(resized_image)
-            self.ui_elements["exercise_img"] = tk.Label(self.window, image=photo)
+            photo = self.exercise_images.get_photo(cur_exercise, self.get_exercise_image_size())
+            self.ui_elements["exercise_img"].config(image=photo)
             self.ui_elements["exercise_img"].image = photo
             self.show_exercise_control_elements()
         except Exception as e:
@@ -310,5 +343,15 @@ class Counter:
         self.ui_elements["show_stats_btn"].config(text="Show Statistics", command=self.show_statistics)
         self.ui_elements["show_stats_btn"].grid(row=7, column=0, columnspan=2, pady=10)
 
+    def close(self):
+        """Record the open usage and fatigue intervals, stop detection and close the window."""
+        from eyesdetection.FatigueDetection import FatigueDetection
+
+        if self.usage_chart is not None:
+            self.usage_chart.stop_live()
+        ProgramController.stop_tracking()
+        FatigueDetection.stop_detection()
+        self.window.destroy()
+
     def run(self):
         self.window.mainloop()
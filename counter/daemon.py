@@ -0,0 +1,105 @@
+import signal
+import time
+from threading import Event, Thread
+
+from audio.dispatcher import AudioDispatcher
+from counter.program_controll import ProgramController
+from counter.session import SessionEngine
+
+
+class HeadlessSession:
+    """Run the work/rest timer, window tracking and fatigue detection without Tk or matplotlib."""
+
+    def __init__(self, work_seconds, rest_seconds, track_windows=True, detect_fatigue=True, streams=None):
+        self.track_windows = track_windows
+        self.detect_fatigue = detect_fatigue
+        self.streams = streams
+        self.engine = None
+        self.stop_event = Event()
+        self.fatigue_status = None
+        self.session = SessionEngine(
+            work_seconds, rest_seconds, on_tick=self.log_tick, on_phase_change=self.change_phase
+        )
+
+    @staticmethod
+    def log(message):
+        print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+    def log_tick(self, remaining):
+        if remaining % 60 == 0:
+            self.log(f"{self.session.phase} phase: {remaining // 60} min left")
+            if self.detect_fatigue:
+                self.log_fatigue_metrics()
+
+    def log_fatigue_metrics(self):
+        from eyesdetection.FatigueDetection import FatigueDetection
+
+        if self.engine is not None:
+            for stream_id, metrics in sorted(self.engine.stats.items()):
+                self.log(
+                    f"Stream {stream_id}: PERCLOS {metrics['perclos'] * 100:.1f}%, "
+                    f"{metrics['frames_dropped']} frames dropped"
+                )
+            return
+        metrics = FatigueDetection.fatigue_snapshot()
+        if "perclos" not in metrics:
+            return
+        self.log(
+            f"PERCLOS {metrics['perclos'] * 100:.1f}%, {metrics['blinks_per_minute']:.0f} blinks/min, "
+            f"mean blink {metrics['mean_blink_duration'] * 1000:.0f} ms"
+        )
+
+    def change_phase(self, phase):
+        AudioDispatcher.shared().play(phase)
+        self.log("Work time!" if phase == SessionEngine.WORK else "Rest time!")
+
+    def update_fatigue_status(self, status):
+        """Log fatigue status changes; called from the detection thread."""
+        if status != self.fatigue_status:
+            self.fatigue_status = status
+            self.log(f"Fatigue status: {status}")
+            ProgramController.record_fatigue_status(status)
+
+    def update_stream_status(self, stream_id, status):
+        """Log fatigue status changes of one stream; called from the engine's results thread."""
+        self.log(f"Stream {stream_id} fatigue status: {status}")
+
+    def run(self):
+        """Run until interrupted with Ctrl+C or SIGTERM."""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_event.set())
+        if self.track_windows:
+            Thread(target=ProgramController.track_active_window, daemon=True).start()
+        if self.detect_fatigue and self.streams:
+            from eyesdetection.multistream import MultiStreamEngine
+
+            self.engine = MultiStreamEngine(self.streams).start(self.update_stream_status)
+        elif self.detect_fatigue:
+            from eyesdetection.FatigueDetection import FatigueDetection
+
+            FatigueDetection.start_detection(self.update_fatigue_status)
+
+        self.session.start()
+        try:
+            while not self.stop_event.is_set():
+                self.stop_event.wait(self.session.poll())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        self.session.stop()
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
+        elif self.detect_fatigue:
+            from eyesdetection.FatigueDetection import FatigueDetection
+
+            FatigueDetection.stop_detection()
+        if self.track_windows:
+            ProgramController.stop_tracking()
+            ProgramController.print_usage_summary()
+        elif ProgramController.fatigue_status is not None:
+            ProgramController.record_fatigue_status(None)
+            ProgramController.usage_store().flush()
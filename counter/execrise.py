@@ -1,12 +1,22 @@
+import json
+import os
+import time
+from threading import Lock, Thread
+
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class Exercise:
+    base_api = "http://localhost:8080/api/v1/exercises"
+    timeout = (3.05, 10)
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
     @staticmethod
     def get_exercise():
-        base_api = "http://localhost:8080/api/v1/exercises"
         try:
-            response = requests.get(base_api + "/random")
+            response = Exercise.session.get(Exercise.base_api + "/random", timeout=Exercise.timeout)
 
             if response.status_code == 200:
                 return response.json()
@@ -16,3 +26,84 @@ class Exercise:
         except requests.exceptions.RequestException as e:
             print(f"An error occurred: {e}")
             return None
+
+
+class ExerciseCatalog:
+    """In-memory exercise list, persisted on disk and refreshed in the background.
+
+    exercises() never touches the network, so the rest screen can always be shown
+    immediately; a stale or missing list is refreshed by prefetch() on a worker thread.
+    Listeners are told when a new list arrives. The backend's /random set changes per
+    request, so the client forces a prefetch for every session; the TTL only bounds
+    how long the on-disk copy is trusted at startup.
+    """
+
+    CACHE_PATH = "data/exercises.json"
+    TTL_SECONDS = 3600
+
+    def __init__(self, cache_path=CACHE_PATH, ttl_seconds=TTL_SECONDS):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.items = []
+        self.fetched_at = 0.0
+        self.lock = Lock()
+        self.fetch_thread = None
+        self.listeners = []
+        self.load_from_disk()
+
+    def load_from_disk(self):
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cached.get("exercises"):
+            self.items = cached["exercises"]
+            self.fetched_at = cached.get("fetched_at", 0.0)
+
+    def save_to_disk(self, items, fetched_at):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"fetched_at": fetched_at, "exercises": items}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not save exercise cache: {e}")
+
+    def is_stale(self):
+        return not self.items or time.time() - self.fetched_at > self.ttl_seconds
+
+    def exercises(self):
+        """Return the cached exercise list without blocking, starting a refresh if it is stale."""
+        if self.is_stale():
+            self.prefetch()
+        return self.items
+
+    def add_listener(self, callback):
+        """Call callback(exercises) from the fetch thread whenever a new list arrives."""
+        self.listeners.append(callback)
+
+    def prefetch(self, force=False):
+        """Refresh the list on a background thread unless it is fresh or already being fetched."""
+        with self.lock:
+            if self.fetch_thread is not None and self.fetch_thread.is_alive():
+                return
+            if not force and not self.is_stale():
+                return
+            self.fetch_thread = Thread(target=self.refresh, daemon=True)
+            self.fetch_thread.start()
+
+    def refresh(self):
+        """Fetch the list from the backend, keeping the previous one if the request fails."""
+        items = Exercise.get_exercise()
+        if not items:
+            return
+        fetched_at = time.time()
+        self.items = items
+        self.fetched_at = fetched_at
+        self.save_to_disk(items, fetched_at)
+        for callback in self.listeners:
+            callback(items)
@@ -0,0 +1,137 @@
+import base64
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from helper.convert_to_image import MANIFEST_NAME, normalize_name
+
+
+class ExerciseImageCache:
+    """Bounded LRU cache of decoded, resized exercise images keyed by exercise and size.
+
+    Decoding and resizing can run on a background thread via prefetch(); the Tk
+    PhotoImage is created lazily on the main thread and cached with the image.
+    Images pre-sized by helper/convert_to_image.py in asset_dir are used instead of
+    the downloaded base64 data when the exercise's image (or name) is in its manifest.
+    """
+
+    ASSET_DIR = os.path.join("images", "build")
+
+    def __init__(self, max_entries=16, asset_dir=ASSET_DIR):
+        self.max_entries = max_entries
+        self.asset_dir = asset_dir
+        self.assets = self.load_assets(asset_dir)
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exercise-images")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def exercise_key(exercise):
+        """Identify an exercise by its id when present, else by its name and image data."""
+        if exercise.get("id") is not None:
+            return exercise["id"]
+        return exercise.get("name"), hash(exercise["image"])
+
+    @staticmethod
+    def load_assets(asset_dir):
+        """Read the asset manifest as {source stem: {(width, height): file path}}."""
+        try:
+            with open(os.path.join(asset_dir, MANIFEST_NAME)) as f:
+                images = json.load(f).get("images", {})
+        except (OSError, ValueError):
+            return {}
+        assets = {}
+        for name, entry in images.items():
+            sizes = {
+                tuple(int(part) for part in size.split("x")): os.path.join(asset_dir, output)
+                for size, output in entry.get("outputs", {}).items()
+            }
+            assets[name.lower()] = sizes
+            assets.setdefault(os.path.splitext(name)[0].lower(), sizes)
+        return assets
+
+    def asset_path(self, exercise, size):
+        """Return the pre-sized file closest above size for the exercise, or None.
+
+        Exercises are matched by their image_name, else by their normalized name.
+        """
+        for key in (exercise.get("image_name"), exercise.get("name")):
+            sizes = self.assets.get(normalize_name(key).lower()) if key else None
+            if sizes:
+                larger = [candidate for candidate in sizes if candidate[0] >= size[0] and candidate[1] >= size[1]]
+                best = min(larger, key=lambda s: s[0] * s[1]) if larger else max(sizes, key=lambda s: s[0] * s[1])
+                return sizes[best]
+        return None
+
+    @staticmethod
+    def render(source, size):
+        """Decode an image (a file path or file object) and resize it to size."""
+        from PIL import Image
+
+        image = Image.open(source)
+        if image.size == size:
+            # Pre-sized by helper/convert_to_image.py; decoding is all that is left.
+            image.load()
+            return image
+        return image.resize(size, Image.ADAPTIVE)
+
+    def render_exercise(self, exercise, size):
+        """Render the exercise's pre-sized asset if there is one, else its downloaded image."""
+        path = self.asset_path(exercise, size)
+        if path is not None:
+            try:
+                return self.render(path, size)
+            except OSError as e:
+                print(f"Could not read pre-sized image {path}: {e}")
+        return self.render(BytesIO(base64.b64decode(exercise["image"])), size)
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def store(self, key, image):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {"image": image, "photo": None}
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            self.entries.move_to_end(key)
+            return entry
+
+    def get_photo(self, exercise, size):
+        """Return a PhotoImage for the exercise at size; must be called on the Tk main thread."""
+        key = (self.exercise_key(exercise), size)
+        entry = self.lookup(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.store(key, self.render_exercise(exercise, size))
+        else:
+            self.hits += 1
+        if entry["photo"] is None:
+            from PIL import ImageTk
+
+            entry["photo"] = ImageTk.PhotoImage(entry["image"])
+        return entry["photo"]
+
+    def prefetch(self, exercises, size):
+        """Decode and resize the given exercises in the background."""
+        for exercise in list(exercises or [])[:self.max_entries]:
+            self.executor.submit(self.prepare, exercise, size)
+
+    def prepare(self, exercise, size):
+        key = (self.exercise_key(exercise), size)
+        if self.lookup(key) is not None:
+            return
+        try:
+            self.store(key, self.render_exercise(exercise, size))
+        except Exception as e:
+            print(f"Error pre-rendering exercise image: {e}")
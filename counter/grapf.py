@@ -1,6 +1,6 @@
-import matplotlib.pyplot as plt
 from tkinter import Toplevel
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from counter.usage_chart import UsageChart
 
 
 class UsageGraph:
@@ -8,45 +8,41 @@ class UsageGraph:
         """
         Initialize the UsageGraph class.
 
-        :param usage_data: Dictionary of program names and their usage times.
+        :param usage_data: Dictionary of program names and their usage times, or a
+            callable returning one to keep the graph refreshing live.
         :param master_window: The main Tkinter window instance.
         """
         self.usage_data = usage_data
         self.master_window = master_window
+        self.chart = None
 
-    def create_graph(self):
-        """Create the graph using matplotlib."""
-        if not self.usage_data:
+    def create_graph(self, master):
+        """Create the usage chart inside master."""
+        usage = self.usage_data() if callable(self.usage_data) else self.usage_data
+        if not usage:
             print("No data available for graph.")
             return None
 
-        programs = list(self.usage_data.keys())
-        usage_times = list(self.usage_data.values())
-
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.barh(programs, usage_times, color="skyblue")
-        ax.set_xlabel("Time (seconds)", fontsize=12)
-        ax.set_ylabel("Programs", fontsize=12)
-        ax.set_title("Program Usage", fontsize=16)
-        plt.tight_layout()
-        return fig
+        self.chart = UsageChart(master, figsize=(10, 6))
+        if callable(self.usage_data):
+            self.chart.start_live(self.usage_data)
+        else:
+            self.chart.update(usage)
+        return self.chart
 
     def show_graph(self):
         """Display the graph in a new Tkinter window."""
-        fig = self.create_graph()
-        if fig is None:
-            return
-
-
         new_window = Toplevel(self.master_window)
         new_window.title("Program Usage Graph")
         new_window.geometry("800x600")
 
+        if self.create_graph(new_window) is None:
+            new_window.destroy()
+            return
 
-        canvas = FigureCanvasTkAgg(fig, master=new_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-
+        self.chart.widget().pack(fill="both", expand=True)
+        new_window.protocol("WM_DELETE_WINDOW", self.close)
 
-        plt.close(fig)
+    def close(self):
+        self.chart.stop_live()
+        self.chart.widget().winfo_toplevel().destroy()
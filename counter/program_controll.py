@@ -1,78 +1,181 @@
 import time
-from threading import Thread, Event
-from Quartz import (
-    CGWindowListCopyWindowInfo,
-    kCGWindowListOptionOnScreenOnly,
-    kCGWindowListExcludeDesktopElements,
-)
-from AppKit import NSWorkspace
-from collections import defaultdict
+from threading import Event
+
+from counter.usage_aggregate import UsageAggregator
+from counter.usage_store import UsageStore, today_start
+from counter.window_backends import default_backend
 
 
 class ProgramController:
-    usage_log = defaultdict(float)
+    usage_log = UsageAggregator()
     active_window = None
     start_time = None
     stop_event = Event()
+    store = None
+    backend = None
+    wall_anchor = None
+    fatigue_status = None
+    fatigue_since = None
+
+    @staticmethod
+    def usage_store():
+        """Return the durable usage store, opening it on first use."""
+        if ProgramController.store is None:
+            ProgramController.store = UsageStore()
+        return ProgramController.store
+
+    @staticmethod
+    def window_backend():
+        """Return the active-window backend, picking the platform default on first use."""
+        if ProgramController.backend is None:
+            ProgramController.backend = default_backend()
+        return ProgramController.backend
+
+    @staticmethod
+    def window_label(app_name, title):
+        """Format an app and window title the way usage is displayed."""
+        return f"{app_name} - {title}" if title else app_name
 
     @staticmethod
     def get_active_window():
         """Get the full title of the currently active window."""
-        try:
-
-            active_app = NSWorkspace.sharedWorkspace().frontmostApplication()
-            app_name = active_app.localizedName()
+        return ProgramController.window_label(*ProgramController.get_active_app_and_title())
 
+    @staticmethod
+    def get_active_app_and_title():
+        """Get the (app name, window title) of the currently active window."""
+        return ProgramController.window_backend().current()
 
-            windows = CGWindowListCopyWindowInfo(
-                kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements, 0
-            )
-            for window in windows:
-                if (
-                    "kCGWindowOwnerName" in window
-                    and window["kCGWindowOwnerName"] == app_name
-                    and "kCGWindowName" in window
-                ):
-
-                    return f"{app_name} - {window['kCGWindowName']}"
-            return app_name
-        except Exception as e:
-            print(f"Error getting active window: {e}")
-            return "Unknown Window"
+    @staticmethod
+    def to_wall_time(timestamp):
+        """Convert a backend clock reading to epoch seconds for storage."""
+        return ProgramController.wall_anchor[0] + (timestamp - ProgramController.wall_anchor[1])
 
     @staticmethod
-    def track_active_window():
+    def track_active_window(backend=None):
         """Track time spent on each active window."""
+        if backend is not None:
+            ProgramController.backend = backend
+        try:
+            backend = ProgramController.window_backend()
+        except Exception as e:
+            print(f"Active-window tracking unavailable: {e}")
+            return
+        ProgramController.seed_usage_log()
         print("Tracking started.")
-        ProgramController.start_time = time.time()
-        while not ProgramController.stop_event.is_set():
-            current_window = ProgramController.get_active_window()
-            current_time = time.time()
-
+        ProgramController.wall_anchor = (time.time(), backend.now())
+        for timestamp, app_name, title in backend.watch(ProgramController.stop_event):
+            current_window = (app_name, title)
             if current_window != ProgramController.active_window:
-                if ProgramController.active_window:
-                    elapsed_time = current_time - ProgramController.start_time
-                    ProgramController.usage_log[ProgramController.active_window] += elapsed_time
-                    print(f"Switched from '{ProgramController.active_window}' after {elapsed_time:.2f} seconds.")
+                ProgramController.close_active_interval(timestamp)
 
                 ProgramController.active_window = current_window
-                ProgramController.start_time = current_time
-                print(f"Now active: {ProgramController.active_window}")
+                ProgramController.start_time = timestamp
+                print(f"Now active: {ProgramController.window_label(*current_window)}")
 
-            time.sleep(1)
+    @staticmethod
+    def close_active_interval(end_time):
+        """Record the time spent in the active window up to end_time (backend clock)."""
+        if not ProgramController.active_window:
+            return
+        app_name, title = ProgramController.active_window
+        label = ProgramController.window_label(app_name, title)
+        elapsed_time = end_time - ProgramController.start_time
+        ProgramController.usage_log.add(app_name, title, elapsed_time)
+        ProgramController.usage_store().record(
+            ProgramController.to_wall_time(ProgramController.start_time),
+            ProgramController.to_wall_time(end_time),
+            app_name,
+            title,
+        )
+        print(f"Switched from '{label}' after {elapsed_time:.2f} seconds.")
+
+    @staticmethod
+    def record_fatigue_status(status, timestamp=None):
+        """Close the interval of the previous fatigue status and start one for `status`.
+
+        timestamp is epoch seconds (now by default); pass None as status to just close.
+        """
+        if status == ProgramController.fatigue_status:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        if ProgramController.fatigue_status is not None:
+            ProgramController.usage_store().record_fatigue(
+                ProgramController.fatigue_since, timestamp, ProgramController.fatigue_status
+            )
+        ProgramController.fatigue_status = status
+        ProgramController.fatigue_since = timestamp
 
     @staticmethod
     def stop_tracking():
         """Stop tracking active windows."""
         ProgramController.stop_event.set()
+        if ProgramController.backend is not None:
+            ProgramController.close_active_interval(ProgramController.backend.now())
+        ProgramController.active_window = None
+        ProgramController.record_fatigue_status(None)
+        ProgramController.usage_store().flush()
         print("\nTracking stopped.")
 
     @staticmethod
-    def print_usage_summary():
+    def aggregate_store(since):
+        """Fold the stored totals since `since` into a bounded UsageAggregator."""
+        aggregator = UsageAggregator(ProgramController.usage_log.titles_per_app)
+        for (app_name, title), seconds in ProgramController.usage_store().totals(since=since).items():
+            aggregator.add(app_name, title, seconds)
+        return aggregator
+
+    @staticmethod
+    def seed_usage_log():
+        """Start the live aggregate from today's stored usage."""
+        ProgramController.usage_log = ProgramController.aggregate_store(today_start())
+
+    @staticmethod
+    def usage_aggregate(since=None):
+        """Return the live aggregate, or one built from the store when `since` is given."""
+        if since is None:
+            return ProgramController.usage_log
+        return ProgramController.aggregate_store(since)
+
+    @staticmethod
+    def open_interval():
+        """Return (app name, title, seconds so far) of the window being tracked, or None."""
+        active_window, start_time = ProgramController.active_window, ProgramController.start_time
+        if not active_window or start_time is None or ProgramController.backend is None:
+            return None
+        return active_window[0], active_window[1], max(0.0, ProgramController.backend.now() - start_time)
+
+    @staticmethod
+    def usage_totals(since=None, top_n=None, include_open=False):
+        """Return {window label: seconds}, titles beyond the per-app top-K folded into "other".
+
+        With include_open the time spent so far in the active window is added, so a live
+        view moves while the window it is shown in stays active.
+        """
+        open_interval = ProgramController.open_interval() if include_open and since is None else None
+        if open_interval is None:
+            return ProgramController.usage_aggregate(since).flat(top_n)
+        totals = ProgramController.usage_aggregate(since).flat()
+        app_name, title, seconds = open_interval
+        label = ProgramController.window_label(app_name, title)
+        totals[label] = totals.get(label, 0.0) + seconds
+        rows = sorted(totals.items(), key=lambda row: row[1], reverse=True)
+        return dict(rows[:top_n] if top_n is not None else rows)
+
+    @staticmethod
+    def print_usage_summary(since=None):
         """Print a summary of time spent on each window."""
-        if not ProgramController.usage_log:
+        aggregate = ProgramController.usage_aggregate(since)
+        if not len(aggregate):
             print("\nNo data to display.")
             return
         print("\nTime Spent on Programs:")
-        for window, seconds in ProgramController.usage_log.items():
-            print(f"{window}: {seconds:.2f} seconds")
+        for app_name, total in sorted(aggregate.app_totals().items(), key=lambda item: item[1], reverse=True):
+            print(f"{app_name}: {total:.2f} seconds")
+            kept, other, error_bound = aggregate.summary(app_name)
+            for title, seconds, error in kept:
+                if title:
+                    print(f"    {title}: {seconds:.2f} seconds (+{error:.2f})")
+            if other > 0:
+                print(f"    {UsageAggregator.OTHER}: {other:.2f} seconds (each title <= {error_bound:.2f})")
@@ -0,0 +1,107 @@
+import math
+import time
+
+
+class MonotonicClock:
+    """Real time from time.monotonic()."""
+
+    def now(self):
+        return time.monotonic()
+
+
+class VirtualClock:
+    """Manually advanced clock for simulations and tests."""
+
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def advance_to(self, timestamp):
+        self.time = max(self.time, timestamp)
+
+
+class SessionEngine:
+    """UI-independent work/rest cycle driven by monotonic deadlines.
+
+    Phase ends and once-per-second ticks are computed from the phase start time, so
+    late wakeups never accumulate drift, and a wakeup that is late by several seconds
+    produces a single tick with the current remaining time. The caller sleeps for
+    poll()'s return value and calls poll() again, from Tk's after() or any loop.
+    """
+
+    WORK = "work"
+    REST = "rest"
+    TICK_SECONDS = 1.0
+
+    def __init__(self, work_seconds, rest_seconds, clock=None, on_tick=None, on_phase_change=None):
+        self.durations = {
+            SessionEngine.WORK: max(1.0, work_seconds),
+            SessionEngine.REST: max(1.0, rest_seconds),
+        }
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.on_tick = on_tick
+        self.on_phase_change = on_phase_change
+        self.phase = None
+        self.phase_start = None
+        self.phase_end = None
+        self.next_tick = None
+        self.tick_index = 0
+        self.completed_phases = 0
+        self.tick_count = 0
+
+    def start(self, phase=WORK):
+        """Begin the cycle with the given phase."""
+        self.enter_phase(phase, self.clock.now())
+
+    def enter_phase(self, phase, start_time):
+        self.phase = phase
+        self.phase_start = start_time
+        self.phase_end = start_time + self.durations[phase]
+        self.tick_index = 1
+        self.next_tick = start_time + self.TICK_SECONDS
+        if self.on_phase_change is not None:
+            self.on_phase_change(phase)
+
+    def remaining(self, now=None):
+        """Whole seconds left in the current phase."""
+        if now is None:
+            now = self.clock.now()
+        return max(0, math.ceil(self.phase_end - now - 1e-9))
+
+    def poll(self):
+        """Handle everything due by now and return the seconds until the next deadline."""
+        if self.phase is None:
+            return None
+        now = self.clock.now()
+        while now >= self.phase_end:
+            self.completed_phases += 1
+            next_phase = SessionEngine.REST if self.phase == SessionEngine.WORK else SessionEngine.WORK
+            self.enter_phase(next_phase, self.phase_end)
+
+        if now >= self.next_tick:
+            # An integer tick index, stepped until the deadline is strictly in the future,
+            # so rounding can never schedule a tick at `now` and return a zero delay.
+            self.tick_index = max(self.tick_index + 1, math.floor((now - self.phase_start) / self.TICK_SECONDS))
+            while self.phase_start + self.tick_index * self.TICK_SECONDS <= now:
+                self.tick_index += 1
+            self.next_tick = self.phase_start + self.tick_index * self.TICK_SECONDS
+            self.tick_count += 1
+            if self.on_tick is not None:
+                self.on_tick(self.remaining(now))
+        return max(0.0, min(self.next_tick, self.phase_end) - now)
+
+    def stop(self):
+        self.phase = None
+
+    def simulate(self, duration):
+        """Run the cycle for `duration` seconds on a VirtualClock, jumping between deadlines."""
+        end = self.clock.now() + duration
+        while self.phase is not None:
+            delay = self.poll()
+            if self.clock.now() + delay > end:
+                self.clock.advance_to(end)
+                self.poll()
+                break
+            self.clock.advance_to(self.clock.now() + delay)
@@ -0,0 +1,38 @@
+class StatusBridge:
+    """Hand the latest fatigue status from the detection thread to the Tk main thread.
+
+    publish() only stores the newest value in a single slot (an atomic attribute
+    assignment), so the detector never blocks or touches Tk. The Tk side drains the
+    slot on a window.after poll and applies it only when the status changed.
+    """
+
+    def __init__(self, apply_status, poll_interval_ms=100):
+        self.apply_status = apply_status
+        self.poll_interval_ms = poll_interval_ms
+        self.latest = None
+        self.applied = None
+        self.published_count = 0
+        self.applied_count = 0
+        self.window = None
+
+    def publish(self, status):
+        """Record a status from any thread; cheap enough to call every frame."""
+        self.latest = status
+        self.published_count += 1
+
+    def attach(self, window):
+        """Start draining published statuses on the Tk event loop."""
+        self.window = window
+        self.window.after(self.poll_interval_ms, self.poll)
+
+    def poll(self):
+        status = self.latest
+        if status is not None and status != self.applied:
+            self.applied = status
+            self.applied_count += 1
+            self.apply_status(status)
+        self.window.after(self.poll_interval_ms, self.poll)
+
+    def stats(self):
+        """Return how many updates were published and how many reached the UI."""
+        return {"published": self.published_count, "applied": self.applied_count}
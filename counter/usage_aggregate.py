@@ -0,0 +1,109 @@
+import sys
+from threading import RLock
+
+
+class SpaceSaving:
+    """Weighted space-saving sketch that keeps at most `capacity` heavy hitters.
+
+    A key that is not tracked replaces the smallest counter and inherits its count
+    as error, so each kept count overestimates the true value by at most `error`,
+    and any dropped key had at most min_count() seconds.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}
+        self.total = 0.0
+
+    def add(self, key, weight):
+        self.total += weight
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0.0]
+        else:
+            smallest = min(self.counters, key=lambda k: self.counters[k][0])
+            count, _ = self.counters.pop(smallest)
+            self.counters[key] = [count + weight, count]
+
+    def min_count(self):
+        """Upper bound on the count of any key that is not tracked."""
+        if len(self.counters) < self.capacity:
+            return 0.0
+        return min(count for count, _ in self.counters.values())
+
+    def top(self):
+        """Return [(key, count, error)] sorted by count, largest first."""
+        return sorted(
+            ((key, count, error) for key, (count, error) in self.counters.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+class UsageAggregator:
+    """Two-level usage totals, app then window title, with bounded memory.
+
+    App totals are exact. Per app only the top `titles_per_app` titles are kept
+    (space-saving); everything else is reported as "other". Title strings are interned
+    so repeated titles share one object. The tracking thread adds while the UI reads,
+    so every method holds the aggregator's lock.
+    """
+
+    OTHER = "other"
+
+    def __init__(self, titles_per_app=10):
+        self.titles_per_app = titles_per_app
+        self.apps = {}
+        self.lock = RLock()
+
+    def add(self, app_name, title, seconds):
+        """Add seconds spent in app_name / title."""
+        app_name = sys.intern(app_name)
+        title = sys.intern(title or "")
+        with self.lock:
+            titles = self.apps.get(app_name)
+            if titles is None:
+                titles = self.apps[app_name] = SpaceSaving(self.titles_per_app)
+            titles.add(title, seconds)
+
+    def app_totals(self):
+        """Return {app: exact seconds}."""
+        with self.lock:
+            return {app_name: titles.total for app_name, titles in self.apps.items()}
+
+    def summary(self, app_name):
+        """Return ([(title, seconds, error)], other seconds, error bound) for one app.
+
+        Title seconds are guaranteed lower bounds (count - error); the overestimate they
+        were corrected by moves into "other". error bound caps the true seconds of any
+        title folded into "other".
+        """
+        with self.lock:
+            titles = self.apps[app_name]
+            kept = sorted(
+                ((title, count - error, error) for title, count, error in titles.top()),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            other = max(0.0, titles.total - sum(seconds for _, seconds, _ in kept))
+            return kept, other, titles.min_count()
+
+    def flat(self, top_n=None):
+        """Return {display label: seconds} with titles folded per app, largest first."""
+        rows = []
+        with self.lock:
+            for app_name in self.apps:
+                kept, other, _ = self.summary(app_name)
+                for title, seconds, _ in kept:
+                    rows.append((f"{app_name} - {title}" if title else app_name, seconds))
+                if other > 0:
+                    rows.append((f"{app_name} - {self.OTHER}", other))
+        rows.sort(key=lambda row: row[1], reverse=True)
+        if top_n is not None:
+            rows = rows[:top_n]
+        return dict(rows)
+
+    def __len__(self):
+        return len(self.apps)
@@ -0,0 +1,239 @@
+"""Vectorized analytics over the usage log: time-bucketed usage, focus sessions,
+context switches and time spent while tired, exported as daily or weekly reports.
+
+    python -m counter.usage_analytics --period day --days 30 --out data/usage_daily.csv
+    python -m counter.usage_analytics --period week --days 84 --out data/usage_weekly.parquet
+
+Every computation works on whole NumPy columns (searchsorted, repeat, reduceat,
+bincount) instead of looping over intervals in Python.
+"""
+import argparse
+import csv
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from counter.usage_store import UsageStore
+
+REPORT_COLUMNS = [
+    "period_start", "app", "active_seconds", "tired_seconds",
+    "focus_sessions", "mean_focus_seconds", "longest_focus_seconds", "switches_in",
+]
+
+
+def bucket_edges(since, until, period="day"):
+    """Local-time bucket boundaries covering [since, until): hour, day or week (Monday) starts."""
+    start = datetime.fromtimestamp(since)
+    if period == "hour":
+        start = start.replace(minute=0, second=0, microsecond=0)
+        step = timedelta(hours=1)
+    else:
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        step = timedelta(days=1)
+        if period == "week":
+            start -= timedelta(days=start.weekday())
+            step = timedelta(days=7)
+    edges = [start.timestamp()]
+    while edges[-1] < until or len(edges) < 2:
+        start += step
+        edges.append(start.timestamp())
+    return np.array(edges)
+
+
+def bucket_index(sorted_values, edges, side="left"):
+    """Bucket of every value in a sorted array: k for edges[k] <= value < edges[k + 1]
+    (or edges[k] < value <= edges[k + 1] with side="right"). Searches the few edges in
+    the values rather than every value in the edges."""
+    counts = np.diff(np.searchsorted(sorted_values, edges, side=side))
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+def expand_ranges(firsts, counts):
+    """Return (owner, index) for every index in the ranges [first, first + count), owner
+    being the position of the range; a vectorized form of a nested range loop."""
+    owners = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.repeat(firsts, counts) + offsets
+
+
+class UsageFrame:
+    """Window-usage intervals as columns: start and end (epoch seconds) and an app code.
+
+    Intervals come from one active window at a time, so they do not overlap; they are
+    kept sorted by start (and therefore by end) and clipped to [since, until).
+    """
+
+    def __init__(self, starts, ends, app_codes, apps, since, until):
+        starts = np.maximum(np.asarray(starts, dtype=np.float64), since)
+        ends = np.minimum(np.asarray(ends, dtype=np.float64), until)
+        keep = ends > starts
+        starts, ends, app_codes = starts[keep], ends[keep], np.asarray(app_codes, dtype=np.int64)[keep]
+        if np.any(starts[1:] < starts[:-1]):
+            order = np.argsort(starts, kind="stable")
+            starts, ends, app_codes = starts[order], ends[order], app_codes[order]
+        self.starts = starts
+        self.ends = ends
+        self.app_codes = app_codes
+        self.apps = list(apps)
+        self.since = since
+        self.until = until
+
+    @classmethod
+    def load(cls, store, since, until):
+        """Read the intervals overlapping [since, until) from a UsageStore."""
+        rows, apps = store.interval_columns(since, until)
+        return cls(rows[:, 0], rows[:, 1], rows[:, 2].astype(np.int64), apps, since, until)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def usage(self, edges):
+        """Seconds per bucket and app: an array of shape (len(edges) - 1, number of apps).
+
+        Each interval is first counted whole in the bucket it starts in; the few that
+        cross a bucket edge are then moved out and re-added piece by piece.
+        """
+        bucket_count, app_count = len(edges) - 1, len(self.apps)
+        firsts = bucket_index(self.starts, edges)
+        seconds = np.bincount(firsts * app_count + self.app_codes, weights=self.ends - self.starts,
+                              minlength=bucket_count * app_count)
+        lasts = bucket_index(self.ends, edges, side="right")
+        crossing = np.flatnonzero(lasts > firsts)
+        if len(crossing):
+            codes = self.app_codes[crossing]
+            seconds -= np.bincount(firsts[crossing] * app_count + codes,
+                                   weights=self.ends[crossing] - self.starts[crossing],
+                                   minlength=bucket_count * app_count)
+            rows, buckets = expand_ranges(firsts[crossing], lasts[crossing] - firsts[crossing] + 1)
+            rows = crossing[rows]
+            pieces = np.minimum(self.ends[rows], edges[buckets + 1]) - np.maximum(self.starts[rows], edges[buckets])
+            seconds += np.bincount(buckets * app_count + self.app_codes[rows], weights=pieces,
+                                   minlength=bucket_count * app_count)
+        return seconds.reshape(bucket_count, app_count)
+
+    def within(self, window_starts, window_ends):
+        """Return the parts of the intervals that fall inside the given disjoint windows."""
+        window_starts = np.asarray(window_starts, dtype=np.float64)
+        window_ends = np.asarray(window_ends, dtype=np.float64)
+        firsts = np.searchsorted(self.ends, window_starts, side="right")
+        lasts = np.searchsorted(self.starts, window_ends, side="left")
+        windows, rows = expand_ranges(firsts, np.maximum(lasts - firsts, 0))
+        return UsageFrame(
+            np.maximum(self.starts[rows], window_starts[windows]),
+            np.minimum(self.ends[rows], window_ends[windows]),
+            self.app_codes[rows],
+            self.apps,
+            self.since,
+            self.until,
+        )
+
+    def sessions(self, max_gap=60.0):
+        """Merge consecutive intervals in the same app into focus sessions.
+
+        A session ends when the app changes or the next interval starts more than
+        max_gap seconds later. Returns (starts, ends, app codes, switched), where
+        switched marks sessions entered straight from another app.
+        """
+        if not len(self):
+            empty = np.array([])
+            return empty, empty, np.array([], dtype=np.int64), np.array([], dtype=bool)
+        gaps = self.starts[1:] - self.ends[:-1]
+        app_changed = self.app_codes[1:] != self.app_codes[:-1]
+        boundary = np.concatenate(([True], app_changed | (gaps > max_gap)))
+        firsts = np.flatnonzero(boundary)
+        switched = np.concatenate(([False], app_changed & (gaps <= max_gap)))[firsts]
+        ends = np.maximum.reduceat(self.ends, firsts)
+        return self.starts[firsts], ends, self.app_codes[firsts], switched
+
+
+def fatigue_windows(store, since, until, status="Tired"):
+    """Return (starts, ends) arrays of the stored intervals spent in `status`."""
+    rows = [(start, end) for start, end, row_status in store.fatigue_intervals(since, until) if row_status == status]
+    windows = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return windows[:, 0], windows[:, 1]
+
+
+def build_report(frame, tired_starts, tired_ends, period="day", max_gap=60.0):
+    """Per-period, per-app report as a dict of equal-length columns (see REPORT_COLUMNS)."""
+    edges = bucket_edges(frame.since, frame.until, period)
+    bucket_count, app_count = len(edges) - 1, len(frame.apps)
+    active = frame.usage(edges)
+    tired = frame.within(tired_starts, tired_ends).usage(edges)
+
+    starts, ends, codes, switched = frame.sessions(max_gap)
+    cell = bucket_index(starts, edges) * app_count + codes
+    size = bucket_count * app_count
+    session_count = np.bincount(cell, minlength=size)
+    session_seconds = np.bincount(cell, weights=ends - starts, minlength=size)
+    switches = np.bincount(cell, weights=switched, minlength=size)
+    longest = np.zeros(size)
+    np.maximum.at(longest, cell, ends - starts)
+
+    rows = np.flatnonzero((active.ravel() > 0) | (session_count > 0))
+    bucket, app = np.divmod(rows, app_count)
+    period_format = "%Y-%m-%d %H:00" if period == "hour" else "%Y-%m-%d"
+    labels = [datetime.fromtimestamp(edge).strftime(period_format) for edge in edges[:-1]]
+    return {
+        "period_start": np.array(labels, dtype=object)[bucket],
+        "app": np.array(frame.apps, dtype=object)[app],
+        "active_seconds": active.ravel()[rows],
+        "tired_seconds": tired.ravel()[rows],
+        "focus_sessions": session_count[rows],
+        "mean_focus_seconds": session_seconds[rows] / np.maximum(session_count[rows], 1),
+        "longest_focus_seconds": longest[rows],
+        "switches_in": switches[rows].astype(np.int64),
+    }
+
+
+def usage_report(store, since, until, period="day", max_gap=60.0):
+    """Load [since, until) from the store and build the report for it."""
+    frame = UsageFrame.load(store, since, until)
+    tired_starts, tired_ends = fatigue_windows(store, since, until)
+    return build_report(frame, tired_starts, tired_ends, period, max_gap)
+
+
+def save_report(report, path):
+    """Write the report to CSV, or to Parquet (needs pyarrow) for a .parquet path."""
+    if path.lower().endswith(".parquet"):
+        import pyarrow
+        import pyarrow.parquet
+
+        table = pyarrow.table({column: report[column].tolist() if report[column].dtype == object
+                               else report[column] for column in REPORT_COLUMNS})
+        pyarrow.parquet.write_table(table, path)
+        return
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        writer.writerows(zip(*(report[column] for column in REPORT_COLUMNS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--period", choices=["hour", "day", "week"], default="day", help="Report bucket")
+    parser.add_argument("--days", type=float, default=7, help="How many days back to include")
+    parser.add_argument("--max-gap", type=float, default=60.0,
+                        help="Idle seconds that still count as the same focus session")
+    parser.add_argument("--db", default=UsageStore.DB_PATH, help="Usage database")
+    parser.add_argument("--out", required=True, help="Output path (.csv or .parquet)")
+    args = parser.parse_args()
+
+    until = time.time()
+    store = UsageStore(args.db)
+    try:
+        report = usage_report(store, until - args.days * 86400, until, args.period, args.max_gap)
+    finally:
+        store.close()
+    try:
+        save_report(report, args.out)
+    except ImportError:
+        print("Parquet export needs pyarrow; install it or write a .csv file instead.")
+        return
+    print(f"Wrote {len(report['app'])} {args.period} rows ({report['active_seconds'].sum() / 3600:.1f} h "
+          f"active, {report['tired_seconds'].sum() / 3600:.1f} h tired) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
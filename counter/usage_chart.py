@@ -0,0 +1,103 @@
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+
+class UsageChart:
+    """One persistent horizontal bar chart of program usage.
+
+    The figure, canvas and TOP_N bar artists are built once. update() changes bar
+    widths in place and blits only the bars; the full figure is redrawn only when the
+    labels or the x-axis range have to change; new labels are shortened to
+    MAX_LABEL_CHARS and the layout is recomputed so they stay on the canvas.
+    """
+
+    TOP_N = 10
+    MAX_LABEL_CHARS = 40
+    REFRESH_MS = 5000
+
+    def __init__(self, master, figsize=(8, 4), top_n=TOP_N):
+        self.top_n = top_n
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        positions = list(range(top_n))
+        self.bars = self.ax.barh(positions, [0] * top_n, color="skyblue")
+        for bar in self.bars:
+            bar.set_animated(True)
+        self.ax.set_yticks(positions)
+        self.ax.set_yticklabels([""] * top_n)
+        self.ax.invert_yaxis()
+        self.ax.set_xlim(0, 1)
+        self.ax.set_xlabel("Time (seconds)", fontsize=12)
+        self.ax.set_ylabel("Programs", fontsize=12)
+        self.ax.set_title("Program Usage", fontsize=16)
+        self.figure.tight_layout()
+
+        self.labels = [""] * top_n
+        self.background = None
+        self.refresh_job = None
+        self.usage_source = None
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.draw()
+
+    def widget(self):
+        return self.canvas.get_tk_widget()
+
+    def on_draw(self, event):
+        """Capture the static background after every full draw and paint the bars on top."""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_bars()
+
+    def draw_bars(self):
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+
+    @staticmethod
+    def shorten(label, max_chars=MAX_LABEL_CHARS):
+        """Ellipsize a label in the middle, keeping the app name and the end of the title."""
+        if len(label) <= max_chars:
+            return label
+        head = (max_chars - 1) // 2
+        return f"{label[:head]}\u2026{label[len(label) - (max_chars - 1 - head):]}"
+
+    def update(self, usage):
+        """Show the top-N entries of {program: seconds}."""
+        top = sorted(usage.items(), key=lambda item: item[1], reverse=True)[:self.top_n]
+        labels = [self.shorten(label) for label, _ in top] + [""] * (self.top_n - len(top))
+        widths = [seconds for _, seconds in top] + [0] * (self.top_n - len(top))
+        for bar, width in zip(self.bars, widths):
+            bar.set_width(width)
+
+        largest = max(widths) if top else 0
+        needs_full_draw = labels != self.labels or self.background is None
+        x_max = self.ax.get_xlim()[1]
+        if largest > x_max or (largest > 0 and largest < x_max * 0.5):
+            self.ax.set_xlim(0, largest * 1.2)
+            needs_full_draw = True
+        if labels != self.labels:
+            self.labels = labels
+            self.ax.set_yticklabels(labels)
+            self.figure.tight_layout()
+
+        if needs_full_draw:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_bars()
+        self.canvas.blit(self.ax.bbox)
+
+    def start_live(self, usage_source, interval_ms=REFRESH_MS):
+        """Refresh from usage_source() every interval_ms until stop_live()."""
+        self.stop_live()
+        self.usage_source = usage_source
+        self.refresh_interval_ms = interval_ms
+        self.refresh()
+
+    def refresh(self):
+        self.update(self.usage_source())
+        self.refresh_job = self.widget().after(self.refresh_interval_ms, self.refresh)
+
+    def stop_live(self):
+        if self.refresh_job is not None:
+            self.widget().after_cancel(self.refresh_job)
+            self.refresh_job = None
@@ -0,0 +1,246 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    id INTEGER PRIMARY KEY,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    app TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intervals_start ON intervals (start);
+CREATE TABLE IF NOT EXISTS fatigue_intervals (
+    id INTEGER PRIMARY KEY,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fatigue_intervals_start ON fatigue_intervals (start);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket_start REAL NOT NULL,
+    app TEXT NOT NULL,
+    title TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (period, bucket_start, app, title)
+);
+"""
+
+# Intervals with the app replaced by its index in the sorted list of app names, so the
+# rows are all numbers and load into one float64 array without per-row Python work.
+CODED_INTERVALS = """
+WITH apps AS (SELECT app, ROW_NUMBER() OVER (ORDER BY app) - 1 AS code FROM (SELECT DISTINCT app FROM intervals))
+SELECT intervals.start, intervals.end, apps.code FROM intervals JOIN apps USING (app)
+WHERE intervals.end > ? AND intervals.start < ?
+ORDER BY intervals.start
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (period, bucket_start, app, title, seconds) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (period, bucket_start, app, title) DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+
+def hour_start(timestamp):
+    """Start of the local hour containing timestamp."""
+    return datetime.fromtimestamp(timestamp).replace(minute=0, second=0, microsecond=0).timestamp()
+
+
+def day_start(timestamp):
+    """Start of the local day containing timestamp."""
+    return datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def today_start():
+    """Start of the current local day."""
+    return day_start(time.time())
+
+
+def split_by_hour(start, end):
+    """Yield (hour_start, seconds) pieces of the interval [start, end)."""
+    while start < end:
+        bucket = hour_start(start)
+        next_bucket = hour_start(bucket + 3600 + 1)
+        piece_end = min(end, next_bucket)
+        yield bucket, piece_end - start
+        start = piece_end
+
+
+class UsageStore:
+    """Append-only SQLite (WAL) log of window-switch intervals with incremental rollups.
+
+    record() only queues an interval; a writer thread appends queued intervals in one
+    transaction and adds their seconds to hourly and daily rollups, so usage totals
+    over any range are read from the rollups instead of rescanning the raw log.
+    """
+
+    DB_PATH = "data/usage.db"
+    FLUSH_INTERVAL = 5.0
+    MAX_BATCH = 256
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.db_lock = Lock()
+        self.flush_lock = Lock()
+        self.pending_lock = Lock()
+        self.pending = []
+        self.pending_fatigue = []
+        self.wakeup = Event()
+        self.is_running = True
+        self.writer = Thread(target=self.writer_loop, daemon=True)
+        self.writer.start()
+
+    def record(self, start, end, app, title=""):
+        """Queue one interval (epoch seconds) spent in app/title."""
+        if end <= start:
+            return
+        with self.pending_lock:
+            self.pending.append((start, end, app, title or ""))
+            if len(self.pending) >= self.MAX_BATCH:
+                self.wakeup.set()
+
+    def record_fatigue(self, start, end, status):
+        """Queue one interval (epoch seconds) spent in a fatigue status such as "Tired"."""
+        if end <= start:
+            return
+        with self.pending_lock:
+            self.pending_fatigue.append((start, end, status))
+
+    def writer_loop(self):
+        while self.is_running:
+            self.wakeup.wait(self.FLUSH_INTERVAL)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing usage log: {e}")
+
+    def flush(self):
+        """Write all queued intervals and update the rollups.
+
+        Holds flush_lock for the whole write, so a reader's flush() returns only after
+        a flush already running on the writer thread has committed.
+        """
+        with self.flush_lock:
+            self.write_pending()
+
+    def write_pending(self):
+        with self.pending_lock:
+            batch, self.pending = self.pending, []
+            fatigue_batch, self.pending_fatigue = self.pending_fatigue, []
+        if fatigue_batch:
+            with self.db_lock, self.connection:
+                self.connection.executemany(
+                    "INSERT INTO fatigue_intervals (start, end, status) VALUES (?, ?, ?)", fatigue_batch
+                )
+        if not batch:
+            return
+
+        rollups = {}
+        for start, end, app, title in batch:
+            for bucket, seconds in split_by_hour(start, end):
+                hour_key = ("hour", bucket, app, title)
+                day_key = ("day", day_start(bucket), app, title)
+                rollups[hour_key] = rollups.get(hour_key, 0.0) + seconds
+                rollups[day_key] = rollups.get(day_key, 0.0) + seconds
+
+        with self.db_lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO intervals (start, end, app, title) VALUES (?, ?, ?, ?)", batch
+            )
+            self.connection.executemany(
+                UPSERT_ROLLUP, [key + (seconds,) for key, seconds in rollups.items()]
+            )
+
+    def totals(self, since=None, until=None, period="day"):
+        """Return {(app, title): seconds} summed from the hourly or daily rollups."""
+        self.flush()
+        query = "SELECT app, title, SUM(seconds) FROM rollups WHERE period = ?"
+        params = [period]
+        if since is not None:
+            query += " AND bucket_start >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND bucket_start < ?"
+            params.append(until)
+        query += " GROUP BY app, title"
+        with self.db_lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return {(app, title): seconds for app, title, seconds in rows}
+
+    def timeline(self, period="hour", since=None, until=None):
+        """Return [(bucket_start, app, title, seconds)] ordered by bucket."""
+        self.flush()
+        query = "SELECT bucket_start, app, title, seconds FROM rollups WHERE period = ?"
+        params = [period]
+        if since is not None:
+            query += " AND bucket_start >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND bucket_start < ?"
+            params.append(until)
+        query += " ORDER BY bucket_start"
+        with self.db_lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def intervals(self, since=None, until=None):
+        """Return the raw [(start, end, app, title)] intervals overlapping [since, until)."""
+        self.flush()
+        query = "SELECT start, end, app, title FROM intervals WHERE 1 = 1"
+        params = []
+        if since is not None:
+            query += " AND end > ?"
+            params.append(since)
+        if until is not None:
+            query += " AND start < ?"
+            params.append(until)
+        query += " ORDER BY start"
+        with self.db_lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def interval_columns(self, since=None, until=None):
+        """Return (float64 array of [start, end, app code] rows, app names indexed by code)."""
+        self.flush()
+        since = float("-inf") if since is None else since
+        until = float("inf") if until is None else until
+        with self.db_lock:
+            apps = [app for (app,) in self.connection.execute("SELECT DISTINCT app FROM intervals ORDER BY app")]
+            rows = self.connection.execute(CODED_INTERVALS, (since, until)).fetchall()
+        return np.array(rows, dtype=np.float64).reshape(-1, 3), apps
+
+    def fatigue_intervals(self, since=None, until=None):
+        """Return the [(start, end, status)] fatigue intervals overlapping [since, until)."""
+        self.flush()
+        query = "SELECT start, end, status FROM fatigue_intervals WHERE 1 = 1"
+        params = []
+        if since is not None:
+            query += " AND end > ?"
+            params.append(since)
+        if until is not None:
+            query += " AND start < ?"
+            params.append(until)
+        query += " ORDER BY start"
+        with self.db_lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def close(self):
+        """Flush queued intervals and close the database."""
+        self.is_running = False
+        self.wakeup.set()
+        self.writer.join(timeout=2.0)
+        self.flush()
+        with self.db_lock:
+            self.connection.close()
@@ -0,0 +1,211 @@
+import abc
+import select
+import sys
+import time
+
+from telemetry.stats import Stats
+
+
+class WindowBackend(abc.ABC):
+    """Source of active-window changes.
+
+    watch() yields (timestamp, app name, window title) for the initial window and then
+    every time the active window changes, until stop_event is set. Timestamps come from
+    now(), a monotonic clock, so intervals never depend on poll granularity or wall-clock
+    jumps.
+    """
+
+    def now(self):
+        return time.monotonic()
+
+    @abc.abstractmethod
+    def current(self):
+        """Return the (app name, window title) of the active window."""
+
+    @abc.abstractmethod
+    def watch(self, stop_event):
+        """Yield (timestamp, app name, window title) on every change until stop_event is set."""
+
+
+class MacOSPollingBackend(WindowBackend):
+    """Poll the frontmost application and its window title through Quartz/AppKit."""
+
+    def __init__(self, poll_interval=1.0):
+        from AppKit import NSWorkspace
+        from Quartz import (
+            CGWindowListCopyWindowInfo,
+            kCGWindowListExcludeDesktopElements,
+            kCGWindowListOptionOnScreenOnly,
+        )
+
+        self.poll_interval = poll_interval
+        self.workspace = NSWorkspace.sharedWorkspace()
+        self.copy_window_info = CGWindowListCopyWindowInfo
+        self.list_options = kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements
+
+    def current(self):
+        try:
+            active_app = self.workspace.frontmostApplication()
+            app_name = active_app.localizedName()
+
+
+            windows = self.copy_window_info(self.list_options, 0)
+            for window in windows:
+                if (
+                    "kCGWindowOwnerName" in window
+                    and window["kCGWindowOwnerName"] == app_name
+                    and "kCGWindowName" in window
+                ):
+
+                    return app_name, window["kCGWindowName"]
+            return app_name, ""
+        except Exception as e:
+            print(f"Error getting active window: {e}")
+            return "Unknown Window", ""
+
+    def watch(self, stop_event):
+        last_window = None
+        while not stop_event.is_set():
+            with Stats.timer("window_poll"):
+                current_window = self.current()
+            if current_window != last_window:
+                last_window = current_window
+                yield (self.now(),) + current_window
+            stop_event.wait(self.poll_interval)
+
+
+class X11Backend(WindowBackend):
+    """Follow _NET_ACTIVE_WINDOW (EWMH) property-change events on an X11 display.
+
+    Nothing is polled: the root window and the active window are subscribed to
+    PropertyNotify, so the loop sleeps in select() until the focus or the title changes.
+    A window that stops being active is unsubscribed, and events from any other window
+    are ignored, so background windows that retitle themselves never wake the loop.
+    """
+
+    def __init__(self, display_name=None, wakeup_interval=0.5):
+        from Xlib import X, display, error
+
+        self.X = X
+        self.XError = error.XError
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self.wakeup_interval = wakeup_interval
+        self.NET_ACTIVE_WINDOW = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+        self.NET_WM_NAME = self.display.intern_atom("_NET_WM_NAME")
+        self.WM_NAME = self.display.intern_atom("WM_NAME")
+        self.UTF8_STRING = self.display.intern_atom("UTF8_STRING")
+        self.active_window = None
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.display.flush()
+
+    def get_active_window_object(self):
+        prop = self.root.get_full_property(self.NET_ACTIVE_WINDOW, self.X.AnyPropertyType)
+        if prop is None or not prop.value or not prop.value[0]:
+            return None
+        return self.display.create_resource_object("window", prop.value[0])
+
+    def follow(self, window):
+        """Subscribe to title changes of the newly active window and drop the previous one."""
+        previous = self.active_window
+        if window is not None and previous is not None and window.id == previous.id:
+            return
+        self.active_window = window
+        for target, event_mask in ((previous, self.X.NoEventMask), (window, self.X.PropertyChangeMask)):
+            if target is None:
+                continue
+            try:
+                target.change_attributes(event_mask=event_mask)
+            except self.XError:
+                pass
+
+    def is_watched(self, window):
+        """True for the root window and the window being followed."""
+        return window.id == self.root.id or (self.active_window is not None and window.id == self.active_window.id)
+
+    def describe(self, window):
+        if window is None:
+            return "Desktop", ""
+        try:
+            wm_class = window.get_wm_class()
+            app_name = wm_class[1] if wm_class else "Unknown Window"
+            title = window.get_full_property(self.NET_WM_NAME, self.UTF8_STRING)
+            if title is not None:
+                title = title.value.decode("utf-8", "replace")
+            else:
+                title = window.get_wm_name() or ""
+            return app_name, title
+        except self.XError:
+            return "Unknown Window", ""
+
+    def current(self):
+        window = self.get_active_window_object()
+        self.follow(window)
+        return self.describe(window)
+
+    def watch(self, stop_event):
+        last_window = self.current()
+        yield (self.now(),) + last_window
+        watched_atoms = (self.NET_ACTIVE_WINDOW, self.NET_WM_NAME, self.WM_NAME)
+        while not stop_event.is_set():
+            readable, _, _ = select.select([self.display], [], [], self.wakeup_interval)
+            if not readable and not self.display.pending_events():
+                continue
+            changed = False
+            while self.display.pending_events():
+                event = self.display.next_event()
+                if (
+                    event.type == self.X.PropertyNotify
+                    and event.atom in watched_atoms
+                    and self.is_watched(event.window)
+                ):
+                    changed = True
+            if not changed:
+                continue
+            with Stats.timer("window_poll"):
+                current_window = self.current()
+            if current_window != last_window:
+                last_window = current_window
+                yield (self.now(),) + current_window
+
+
+class SyntheticBackend(WindowBackend):
+    """Replay a scripted list of (seconds since start, app, title) switches on a virtual clock.
+
+    Deterministic and instantaneous, for tests and benchmarks.
+    """
+
+    def __init__(self, events, start=0.0, end=None):
+        self.events = list(events)
+        self.start = start
+        self.end = end
+        self.clock = start
+
+    def now(self):
+        return self.clock
+
+    def current(self):
+        active = ("Unknown Window", "")
+        for offset, app_name, title in self.events:
+            if self.start + offset > self.clock:
+                break
+            active = (app_name, title)
+        return active
+
+    def watch(self, stop_event):
+        for offset, app_name, title in self.events:
+            if stop_event.is_set():
+                return
+            self.clock = self.start + offset
+            yield self.clock, app_name, title
+        if self.end is not None:
+            self.clock = self.start + self.end
+
+
+def default_backend():
+    """Pick the active-window backend for the current platform."""
+    if sys.platform == "darwin":
+        return MacOSPollingBackend()
+    if sys.platform.startswith("linux"):
+        return X11Backend()
+    raise RuntimeError(f"No active-window backend for platform '{sys.platform}'")
@@ -1,94 +1,383 @@
+import time
+
 import cv2
 import dlib
 import numpy as np
-from collections import deque
-from playsound import playsound
-from threading import Thread
+from threading import Lock, Thread
+
+from audio.dispatcher import AudioDispatcher
+from eyesdetection.backends import create_backend
+from eyesdetection.calibration import CalibrationProfile
+from eyesdetection.capture import CaptureConfig, LatestFrameCapture
+from eyesdetection.fatigue_metrics import EarHistory, FatigueMetrics
+from eyesdetection.ring_buffer import RollingMean
+from eyesdetection.scale_tuner import DetectionScaleTuner
+from telemetry.stats import Stats
 
 
 class FatigueDetection:
-    detector = dlib.get_frontal_face_detector()
-    predictor = dlib.shape_predictor("eyesdetection/shape_predictor_68_face_landmarks.dat")
+    # YuNet is the default face detector; until its model is downloaded (or on OpenCV
+    # older than 4.5.4) the default falls back to dlib's HOG. A backend chosen with
+    # use_backend() never falls back.
+    BACKEND = "dnn"
+    FALLBACK_BACKEND = "dlib"
+    backend_chosen = False
+    backend = None
+    models_lock = Lock()
     EAR_THRESHOLD = 0.25
     BLINK_THRESHOLD_FRAMES = 3
     CALIBRATION_FRAMES = 50
 
+    TRACKING_ENABLED = True
+    REDETECT_INTERVAL = 15
+    TRACKING_MIN_CONFIDENCE = 7.0
+
+    capture_config = CaptureConfig()
+    DETECTION_SCALE = 1.0
+    AUTO_TUNE_SCALE = False
+    USE_PROCESSES = False
+    scale_tuner = None
+
+    TIRED_CLOSED_FRAMES = 15
+    PERCLOS_THRESHOLD = 0.15
+    PERCLOS_MIN_SECONDS = 60.0
+    PERCLOS_MIN_FRAMES = 300
+
     blink_count = 0
     consecutive_closed_frames = 0
-    calibration_data = []
+    closed_since = None
+    metrics = FatigueMetrics()
+    ear_history = None
+    profile_name = None
+    calibration = CalibrationProfile(min_samples=CALIBRATION_FRAMES)
     calibrated_ear_threshold = EAR_THRESHOLD
-    smoothed_ear_values = deque(maxlen=10)
+    smoothed_ear_values = RollingMean(10)
     is_running = False
+    alerts_enabled = True
+    capture = None
+    engine = None
+
+    tracker = None
+    frames_since_detection = 0
+
+    @staticmethod
+    def load_models():
+        """Create the configured face/landmark backend and load its models on first use."""
+        if FatigueDetection.backend is not None:
+            return
+        with FatigueDetection.models_lock:
+            if FatigueDetection.backend is None:
+                backend = create_backend(FatigueDetection.BACKEND)
+                try:
+                    backend.load_detector()
+                except (FileNotFoundError, ImportError) as e:
+                    if FatigueDetection.backend_chosen:
+                        raise
+                    print(f"{e}; using the '{FatigueDetection.FALLBACK_BACKEND}' face backend instead.")
+                    FatigueDetection.BACKEND = FatigueDetection.FALLBACK_BACKEND
+                    backend = create_backend(FatigueDetection.BACKEND)
+                    backend.load_detector()
+                backend.load_landmarks()
+                FatigueDetection.backend = backend
+
+    @staticmethod
+    def use_backend(name):
+        """Switch to another backend (see eyesdetection.backends.BACKENDS); loads on next use."""
+        create_backend(name)
+        with FatigueDetection.models_lock:
+            FatigueDetection.BACKEND = name
+            FatigueDetection.backend_chosen = True
+            FatigueDetection.backend = None
+        FatigueDetection.scale_tuner = None
+        FatigueDetection.reset_tracking()
+
+    @staticmethod
+    def warm_up():
+        """Load the models on a background thread so the first frame does not wait for them."""
+        thread = Thread(target=FatigueDetection.load_models, daemon=True)
+        thread.start()
+        return thread
 
     @staticmethod
     def eye_aspect_ratio(eye):
-        """Calculate the Eye Aspect Ratio (EAR)."""
-        A = np.linalg.norm(eye[1] - eye[5])
-        B = np.linalg.norm(eye[2] - eye[4])
-        C = np.linalg.norm(eye[0] - eye[3])
-        return (A + B) / (2.0 * C)
+        """Calculate the Eye Aspect Ratio (EAR).
+
+        Accepts a single (6, 2) eye or a stack of eyes shaped (..., 6, 2).
+        """
+        eye = np.asarray(eye, dtype=np.float64)
+        distances = np.linalg.norm(eye[..., [1, 2, 0], :] - eye[..., [5, 4, 3], :], axis=-1)
+        return (distances[..., 0] + distances[..., 1]) / (2.0 * distances[..., 2])
 
     @staticmethod
-    def calibrate_ear(ear_list):
-        """Calibrate EAR threshold based on initial data."""
-        return sum(ear_list) / len(ear_list)
+    def load_calibration(profile_name=None):
+        """Load the user's saved calibration so valid states are reported from the first frame.
+
+        Without a profile name the login name is used (see CalibrationProfile.default_name).
+        """
+        if profile_name is not None:
+            FatigueDetection.profile_name = profile_name
+        if FatigueDetection.profile_name is None:
+            FatigueDetection.profile_name = CalibrationProfile.default_name()
+        FatigueDetection.calibration = CalibrationProfile.load(
+            FatigueDetection.profile_name, FatigueDetection.CALIBRATION_FRAMES
+        )
+        if FatigueDetection.calibration.is_calibrated():
+            FatigueDetection.calibrated_ear_threshold = FatigueDetection.calibration.threshold()
+        else:
+            FatigueDetection.calibrated_ear_threshold = FatigueDetection.EAR_THRESHOLD
 
     @staticmethod
-    def process_frame(gray_frame, update_callback):
-        """Process a single frame for fatigue detection."""
-        faces = FatigueDetection.detector(gray_frame)
-        for face in faces:
-            landmarks = FatigueDetection.predictor(gray_frame, face)
+    def run_detector(gray_frame, scale):
+        """Search for faces on a frame downscaled by `scale`, returning full-resolution boxes."""
+        Stats.increment("detector_runs")
+        detect = FatigueDetection.backend.detect
+        if scale >= 1.0:
+            with Stats.timer("detector"):
+                faces = detect(gray_frame)
+        else:
+            with Stats.timer("resize"):
+                small_frame = cv2.resize(gray_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            with Stats.timer("detector"):
+                faces = [
+                    dlib.rectangle(
+                        int(face.left() / scale),
+                        int(face.top() / scale),
+                        int(face.right() / scale),
+                        int(face.bottom() / scale),
+                    )
+                    for face in detect(small_frame)
+                ]
+        if faces:
+            Stats.increment("detector_hits")
+        return faces
 
+    @staticmethod
+    def search_faces(gray_frame):
+        """Run the detector at the configured or auto-tuned scale."""
+        if not FatigueDetection.AUTO_TUNE_SCALE:
+            return FatigueDetection.run_detector(gray_frame, FatigueDetection.DETECTION_SCALE)
 
-            left_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in range(36, 42)])
-            right_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in range(42, 48)])
+        if FatigueDetection.scale_tuner is None:
+            FatigueDetection.scale_tuner = DetectionScaleTuner()
+        tuner = FatigueDetection.scale_tuner
+        faces = FatigueDetection.run_detector(gray_frame, tuner.scale)
+        fallback_scale = tuner.fallback_scale()
+        if faces or fallback_scale is None:
+            tuner.record(True if faces else None)
+            return faces
 
+        faces = FatigueDetection.run_detector(gray_frame, fallback_scale)
+        tuner.record(False if faces else None)
+        return faces
 
-            ear_left = FatigueDetection.eye_aspect_ratio(left_eye)
-            ear_right = FatigueDetection.eye_aspect_ratio(right_eye)
-            ear = (ear_left + ear_right) / 2.0
+    @staticmethod
+    def detect_faces(gray_frame):
+        """Run the full-frame face detector and restart tracking on the largest face."""
+        faces = FatigueDetection.search_faces(gray_frame)
+        FatigueDetection.frames_since_detection = 0
+        FatigueDetection.tracker = None
+        if FatigueDetection.TRACKING_ENABLED and len(faces) > 0:
+            face = max(faces, key=lambda rect: rect.area())
+            FatigueDetection.tracker = dlib.correlation_tracker()
+            FatigueDetection.tracker.start_track(gray_frame, face)
+            return [face]
+        return faces
 
+    @staticmethod
+    def locate_faces(gray_frame):
+        """Find the faces to measure, following the tracked face between full detections."""
+        tracker = FatigueDetection.tracker
+        if (
+            not FatigueDetection.TRACKING_ENABLED
+            or tracker is None
+            or FatigueDetection.frames_since_detection >= FatigueDetection.REDETECT_INTERVAL
+        ):
+            return FatigueDetection.detect_faces(gray_frame)
 
-            FatigueDetection.smoothed_ear_values.append(ear)
-            smoothed_ear = sum(FatigueDetection.smoothed_ear_values) / len(FatigueDetection.smoothed_ear_values)
+        with Stats.timer("tracker"):
+            confidence = tracker.update(gray_frame)
+        if confidence < FatigueDetection.TRACKING_MIN_CONFIDENCE:
+            return FatigueDetection.detect_faces(gray_frame)
 
+        FatigueDetection.frames_since_detection += 1
+        position = tracker.get_position()
+        height, width = gray_frame.shape[:2]
+        face = dlib.rectangle(
+            max(0, int(position.left())),
+            max(0, int(position.top())),
+            min(width - 1, int(position.right())),
+            min(height - 1, int(position.bottom())),
+        )
+        return [face]
 
-            if len(FatigueDetection.calibration_data) < FatigueDetection.CALIBRATION_FRAMES:
-                FatigueDetection.calibration_data.append(smoothed_ear)
-                if len(FatigueDetection.calibration_data) >= FatigueDetection.CALIBRATION_FRAMES:
-                    FatigueDetection.calibrated_ear_threshold = FatigueDetection.calibrate_ear(
-                        FatigueDetection.calibration_data
-                    ) * 0.85
-                update_callback("Calibrating")
-                return
+    @staticmethod
+    def reset_tracking():
+        """Forget the tracked face so the next frame runs the full detector."""
+        FatigueDetection.tracker = None
+        FatigueDetection.frames_since_detection = 0
 
+    @staticmethod
+    def reset():
+        """Reset calibration, smoothing, counters and tracking to their initial state."""
+        FatigueDetection.blink_count = 0
+        FatigueDetection.consecutive_closed_frames = 0
+        FatigueDetection.closed_since = None
+        FatigueDetection.metrics = FatigueMetrics()
+        FatigueDetection.calibration = CalibrationProfile(min_samples=FatigueDetection.CALIBRATION_FRAMES)
+        FatigueDetection.calibrated_ear_threshold = FatigueDetection.EAR_THRESHOLD
+        FatigueDetection.smoothed_ear_values.clear()
+        FatigueDetection.reset_tracking()
 
-            if smoothed_ear < FatigueDetection.calibrated_ear_threshold:
-                FatigueDetection.consecutive_closed_frames += 1
-                if FatigueDetection.consecutive_closed_frames >= 15:
-                    playsound('sounds/warning.mp3')  # Alert the user
-                    update_callback("Tired")
-            else:
-                if FatigueDetection.consecutive_closed_frames >= FatigueDetection.BLINK_THRESHOLD_FRAMES:
-                    FatigueDetection.blink_count += 1
-                FatigueDetection.consecutive_closed_frames = 0
-                update_callback("Not Tired")
+    @staticmethod
+    def measure_ear(gray_frame):
+        """Return the averaged EAR of every face located in the frame."""
+        FatigueDetection.load_models()
+        ears = []
+        for face in FatigueDetection.locate_faces(gray_frame):
+            with Stats.timer("predictor"):
+                eyes = FatigueDetection.backend.eyes(gray_frame, face)
+            with Stats.timer("ear"):
+                ears.append(float(FatigueDetection.eye_aspect_ratio(eyes).mean()))
+        return ears
 
     @staticmethod
-    def start_detection(update_callback):
-        """Start fatigue detection in a separate thread."""
+    def is_drowsy(timestamp):
+        """True when PERCLOS over a sufficiently observed window exceeds PERCLOS_THRESHOLD.
+
+        The window must hold PERCLOS_MIN_SECONDS of observed buckets and at least
+        PERCLOS_MIN_FRAMES frames.
+        """
+        metrics = FatigueDetection.metrics
+        metrics.perclos(timestamp)
+        return (
+            metrics.covered_seconds() >= FatigueDetection.PERCLOS_MIN_SECONDS
+            and metrics.total_frames >= FatigueDetection.PERCLOS_MIN_FRAMES
+            and metrics.perclos(timestamp) >= FatigueDetection.PERCLOS_THRESHOLD
+        )
+
+    @staticmethod
+    def fatigue_snapshot(timestamp=None):
+        """Current PERCLOS, blink rate and blink duration plus blink count, for the UI and reports."""
+        engine = FatigueDetection.engine
+        if engine is not None and 0 in engine.stats:
+            return dict(engine.stats[0])
+        if timestamp is None:
+            timestamp = time.monotonic()
+        snapshot = FatigueDetection.metrics.snapshot(timestamp)
+        snapshot["blink_count"] = FatigueDetection.blink_count
+        return snapshot
+
+    @staticmethod
+    def update_state(ear, timestamp=None):
+        """Feed one EAR sample through smoothing, calibration and the fatigue check.
+
+        timestamp is in seconds on a monotonic clock (now by default). Returns the status
+        to report, or None when the status should not be reported.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        FatigueDetection.smoothed_ear_values.append(ear)
+        smoothed_ear = FatigueDetection.smoothed_ear_values.mean()
+
+
+        calibration = FatigueDetection.calibration
+        if not calibration.is_calibrated():
+            calibration.update(smoothed_ear, timestamp)
+            if calibration.is_calibrated():
+                FatigueDetection.calibrated_ear_threshold = calibration.threshold()
+                calibration.save()
+            return "Calibrating"
+
+
+        closed = smoothed_ear < FatigueDetection.calibrated_ear_threshold
+        FatigueDetection.metrics.add_frame(timestamp, closed)
+        if FatigueDetection.ear_history is not None:
+            FatigueDetection.ear_history.append(time.time(), ear, smoothed_ear, closed)
+
+        if closed:
+            if FatigueDetection.consecutive_closed_frames == 0:
+                FatigueDetection.closed_since = timestamp
+            FatigueDetection.consecutive_closed_frames += 1
+            if (
+                FatigueDetection.consecutive_closed_frames >= FatigueDetection.TIRED_CLOSED_FRAMES
+                or FatigueDetection.is_drowsy(timestamp)
+            ):
+                if FatigueDetection.alerts_enabled:
+                    AudioDispatcher.shared().play("warning")  # Alert the user
+                return "Tired"
+            return None
+        else:
+            calibration.update(smoothed_ear, timestamp)
+            FatigueDetection.calibrated_ear_threshold = calibration.threshold()
+            if FatigueDetection.consecutive_closed_frames >= FatigueDetection.BLINK_THRESHOLD_FRAMES:
+                FatigueDetection.blink_count += 1
+                FatigueDetection.metrics.add_blink(timestamp, timestamp - FatigueDetection.closed_since)
+            FatigueDetection.consecutive_closed_frames = 0
+            if FatigueDetection.is_drowsy(timestamp):
+                return "Tired"
+            return "Not Tired"
+
+    @staticmethod
+    def process_frame(gray_frame, update_callback):
+        """Process a single frame for fatigue detection."""
+        for ear in FatigueDetection.measure_ear(gray_frame):
+            status = FatigueDetection.update_state(ear)
+            if status is not None:
+                with Stats.timer("ui_callback"):
+                    update_callback(status)
+            if status == "Calibrating":
+                return
+
+    @staticmethod
+    def start_detection(update_callback, capture_config=None, use_processes=None):
+        """Start fatigue detection in a separate thread.
+
+        With use_processes (default USE_PROCESSES) the single stream runs in worker
+        processes through MultiStreamEngine instead, keeping capture and detection off
+        this process's GIL.
+        """
+        if use_processes is None:
+            use_processes = FatigueDetection.USE_PROCESSES
+        if capture_config is not None:
+            FatigueDetection.capture_config = capture_config
         FatigueDetection.is_running = True
+        if use_processes:
+            from eyesdetection.multistream import MultiStreamEngine, StreamConfig
+
+            stream = StreamConfig(
+                FatigueDetection.capture_config,
+                profile_name=FatigueDetection.profile_name or CalibrationProfile.default_name(),
+                alerts=FatigueDetection.alerts_enabled,
+                detection_scale=FatigueDetection.DETECTION_SCALE,
+                auto_tune_scale=FatigueDetection.AUTO_TUNE_SCALE,
+                backend=FatigueDetection.BACKEND if FatigueDetection.backend_chosen else None,
+                ear_history_path=EarHistory.PATH,
+            )
+            FatigueDetection.engine = MultiStreamEngine([stream]).start(
+                lambda stream_id, status: update_callback(status)
+            )
+            return
+        FatigueDetection.load_calibration()
+        if FatigueDetection.ear_history is None:
+            FatigueDetection.ear_history = EarHistory()
 
         def detection_loop():
-            cap = cv2.VideoCapture(2)
+            capture = FatigueDetection.capture = LatestFrameCapture(FatigueDetection.capture_config).start()
+            FatigueDetection.load_models()
             while FatigueDetection.is_running:
-                ret, frame = cap.read()
-                if not ret:
+                with Stats.timer("capture_wait"):
+                    frame, dropped = capture.read()
+                if frame is None:
                     continue
-                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                FatigueDetection.process_frame(gray_frame, update_callback)
-            cap.release()
+                Stats.increment("frames_dropped", dropped)
+                with Stats.timer("cvt_color"):
+                    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                with Stats.timer("frame"):
+                    FatigueDetection.process_frame(gray_frame, update_callback)
+                Stats.increment("frames_processed")
+            capture.stop()
+            FatigueDetection.calibration.save()
+            FatigueDetection.ear_history.flush()
 
         Thread(target=detection_loop, daemon=True).start()
 
@@ -96,3 +385,13 @@ class FatigueDetection:
     def stop_detection():
         """Stop the fatigue detection process."""
         FatigueDetection.is_running = False
+        if FatigueDetection.engine is not None:
+            FatigueDetection.engine.stop()
+            FatigueDetection.engine = None
+
+    @staticmethod
+    def dropped_frames():
+        """Return how many camera frames were skipped because processing was busy."""
+        if FatigueDetection.capture is None:
+            return 0
+        return FatigueDetection.capture.dropped_frames
@@ -0,0 +1,194 @@
+"""Face detection and eye landmark backends for FatigueDetection.
+
+A backend finds faces (as dlib rectangles, so the correlation tracker works with any
+of them) and returns the 12 eye-contour points of a face as a (2, 6, 2) array: left
+eye then right eye, each in the 68-point model's order, which is what the EAR needs.
+
+    dnn    OpenCV YuNet CNN face detector + 68-point predictor, the default
+           (FatigueDetection.BACKEND); needs OpenCV 4.5.4+ and its model file, and
+           falls back to dlib until both are available
+    dlib   dlib HOG face detector + 68-point predictor (the original pipeline)
+
+Only the face detector is lighter: both backends read the eyes with dlib's ~100 MB
+68-point predictor (only the 12 eye points are copied out of each shape), so memory
+use is about the same. The 5-point model has no eye contour to compute an EAR from,
+and no smaller eye-landmark model is shipped, so a lighter landmark stage was not
+delivered. Measure the detectors on your machine with
+
+    python -m benchmarks.suite --only face_detector_full,face_detector_dnn
+
+or on your footage with replay --compare. The models are not in the repository;
+download them with
+
+    python -m eyesdetection.backends --download dlib    # 68-point predictor (~100 MB)
+    python -m eyesdetection.backends --download dnn     # YuNet (~230 KB) + predictor
+
+which fetches MODEL_URLS into the paths below (run from the repository root).
+"""
+import abc
+import argparse
+import bz2
+import os
+import shutil
+import urllib.request
+
+import cv2
+import dlib
+import numpy as np
+
+FACE_PREDICTOR_PATH = "eyesdetection/shape_predictor_68_face_landmarks.dat"
+YUNET_MODEL_PATH = "eyesdetection/face_detection_yunet_2023mar.onnx"
+EYE_LANDMARKS_68 = range(36, 48)
+
+MODEL_URLS = {
+    FACE_PREDICTOR_PATH: "http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2",
+    YUNET_MODEL_PATH: "https://github.com/opencv/opencv_zoo/raw/main/models/face_detection_yunet/"
+                      "face_detection_yunet_2023mar.onnx",
+}
+
+
+def require_model(path, backend_name):
+    """Raise a FileNotFoundError that says how to get a missing model file."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Model file {path} is missing; download it with "
+            f"python -m eyesdetection.backends --download {backend_name}"
+        )
+
+
+class FaceBackend(abc.ABC):
+    """Interface: load the models, detect() faces, eyes() of one face.
+
+    Subclasses provide load_detector() and detect(); eye landmarks come from the dlib
+    predictor at predictor_path.
+    """
+
+    name = None
+    MODEL_PATHS = (FACE_PREDICTOR_PATH,)
+
+    def __init__(self, predictor_path=FACE_PREDICTOR_PATH):
+        self.predictor_path = predictor_path
+        self.predictor = None
+
+    def load(self):
+        self.load_detector()
+        self.load_landmarks()
+
+    @abc.abstractmethod
+    def load_detector(self):
+        """Load the face detector model."""
+
+    def load_landmarks(self):
+        require_model(self.predictor_path, self.name)
+        self.predictor = LandmarkPredictor(self.predictor_path)
+
+    @abc.abstractmethod
+    def detect(self, gray_frame):
+        """Return the faces in a grayscale frame as a list of dlib.rectangle."""
+
+    def eyes(self, gray_frame, face):
+        """Return the eye contours of `face` as a (2, 6, 2) float64 array."""
+        return self.predictor.eyes(gray_frame, face)
+
+
+class LandmarkPredictor:
+    """dlib 68-point shape predictor that copies out only the 12 eye points."""
+
+    def __init__(self, path):
+        self.path = path
+        self.predictor = dlib.shape_predictor(path)
+
+    def eyes(self, gray_frame, face):
+        shape = self.predictor(gray_frame, face)
+        eyes = np.empty((12, 2), dtype=np.float64)
+        for row, index in enumerate(EYE_LANDMARKS_68):
+            point = shape.part(index)
+            eyes[row] = (point.x, point.y)
+        return eyes.reshape(2, 6, 2)
+
+
+class DlibBackend(FaceBackend):
+    """dlib's HOG frontal face detector and the 68-point shape predictor."""
+
+    name = "dlib"
+
+    def __init__(self, predictor_path=FACE_PREDICTOR_PATH):
+        super().__init__(predictor_path)
+        self.detector = None
+
+    def load_detector(self):
+        self.detector = dlib.get_frontal_face_detector()
+
+    def detect(self, gray_frame):
+        return list(self.detector(gray_frame))
+
+
+class DnnBackend(FaceBackend):
+    """OpenCV's YuNet CNN face detector (cv2.FaceDetectorYN); cheaper than HOG on a CPU
+    and more robust to pose and light."""
+
+    name = "dnn"
+    MODEL_PATH = YUNET_MODEL_PATH
+    MODEL_PATHS = (YUNET_MODEL_PATH, FACE_PREDICTOR_PATH)
+    MIN_CONFIDENCE = 0.6
+
+    def __init__(self, predictor_path=FACE_PREDICTOR_PATH):
+        super().__init__(predictor_path)
+        self.net = None
+        self.input_size = None
+
+    def load_detector(self):
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise ImportError("the dnn face backend needs OpenCV 4.5.4 or newer")
+        require_model(self.MODEL_PATH, self.name)
+        self.net = cv2.FaceDetectorYN.create(self.MODEL_PATH, "", (320, 320), self.MIN_CONFIDENCE)
+
+    def detect(self, gray_frame):
+        height, width = gray_frame.shape[:2]
+        if self.input_size != (width, height):
+            self.input_size = (width, height)
+            self.net.setInputSize(self.input_size)
+        _, detections = self.net.detect(cv2.cvtColor(gray_frame, cv2.COLOR_GRAY2BGR))
+        if detections is None:
+            return []
+        return [
+            dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
+            for x, y, w, h in detections[:, :4]
+        ]
+
+
+BACKENDS = {backend.name: backend for backend in (DlibBackend, DnnBackend)}
+
+
+def create_backend(name):
+    """Instantiate a backend by name (see BACKENDS); models load on backend.load()."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown face backend '{name}'; choose from {', '.join(BACKENDS)}") from None
+
+
+def download(path):
+    """Fetch one model from MODEL_URLS to `path`, unpacking .bz2 archives."""
+    url = MODEL_URLS[path]
+    temp_path = path + ".part"
+    print(f"Downloading {url} -> {path}")
+    with urllib.request.urlopen(url) as response, open(temp_path, "wb") as f:
+        shutil.copyfileobj(bz2.BZ2File(response) if url.endswith(".bz2") else response, f)
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the model files of a face backend.")
+    parser.add_argument("--download", choices=list(BACKENDS), required=True, help="Backend to fetch models for")
+    args = parser.parse_args()
+
+    for path in BACKENDS[args.download].MODEL_PATHS:
+        if os.path.exists(path):
+            print(f"{path} already present")
+        else:
+            download(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import getpass
+import json
+import math
+import os
+import re
+
+
+class CalibrationProfile:
+    """Running open-eye EAR statistics for one user, persisted between sessions.
+
+    The first `min_samples` values use Welford's algorithm for the exact mean and
+    variance; after that the statistics adapt slowly as an exponentially weighted
+    mean/variance with a time constant of ADAPTATION_SECONDS of wall time (not per
+    frame), only from clearly open frames (above mean - 1 stddev), and the mean may
+    move at most MAX_SESSION_DRIFT from the session's baseline. A gradual droop of
+    the eyes therefore still falls below the threshold instead of dragging it along.
+    The closed-eye threshold is derived from mean and stddev.
+    """
+
+    PROFILE_DIR = "data/profiles"
+    DEFAULT_NAME = "default"
+    ADAPTATION_SECONDS = 3600.0
+    MAX_SESSION_DRIFT = 0.05
+    THRESHOLD_STDDEVS = 2.0
+    THRESHOLD_RANGE = (0.7, 0.9)
+    SAVE_EVERY = 600
+
+    def __init__(self, name=None, min_samples=50, directory=PROFILE_DIR):
+        self.name = name
+        self.min_samples = min_samples
+        self.directory = directory
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.unsaved = 0
+        self.baseline_mean = None
+        self.last_timestamp = None
+
+    @staticmethod
+    def default_name():
+        """The login name, or DEFAULT_NAME when the host cannot tell who is logged in."""
+        try:
+            return getpass.getuser() or CalibrationProfile.DEFAULT_NAME
+        except Exception:
+            return CalibrationProfile.DEFAULT_NAME
+
+    @staticmethod
+    def file_name(name):
+        """Reduce a profile name to a safe file name, so it cannot leave the profile directory."""
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", name or "").strip("._")
+        return safe_name or CalibrationProfile.DEFAULT_NAME
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.file_name(self.name)}.json")
+
+    @staticmethod
+    def load(name, min_samples=50, directory=PROFILE_DIR):
+        """Load a saved profile, or start an empty one if none exists."""
+        profile = CalibrationProfile(name, min_samples, directory)
+        try:
+            with open(profile.path) as f:
+                saved = json.load(f)
+            profile.count = int(saved["count"])
+            profile.mean = float(saved["mean"])
+            profile.m2 = float(saved["m2"])
+            if profile.is_calibrated():
+                profile.baseline_mean = profile.mean
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Ignoring unreadable calibration profile '{profile.path}': {e}")
+        return profile
+
+    def save(self):
+        """Write the profile to disk; profiles without a name are never persisted."""
+        if self.name is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"count": self.count, "mean": self.mean, "m2": self.m2}, f)
+            os.replace(temp_path, self.path)
+            self.unsaved = 0
+        except OSError as e:
+            print(f"Could not save calibration profile: {e}")
+
+    def is_calibrated(self):
+        return self.count >= self.min_samples
+
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (min(self.count, self.min_samples) - 1)
+
+    def stddev(self):
+        return math.sqrt(self.variance())
+
+    def update(self, value, timestamp=None):
+        """Add one open-eye EAR sample taken at `timestamp` (seconds, monotonic)."""
+        previous_timestamp, self.last_timestamp = self.last_timestamp, timestamp
+        if self.count < self.min_samples:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+            if self.is_calibrated():
+                self.baseline_mean = self.mean
+        else:
+            if timestamp is None or previous_timestamp is None or value < self.mean - self.stddev():
+                return
+            # Exponentially weighted update; m2 is kept scaled to min_samples - 1.
+            # Cap the step so one frame after a long absence cannot move the stats far.
+            elapsed = min(max(0.0, timestamp - previous_timestamp), 1.0)
+            alpha = 1.0 - math.exp(-elapsed / self.ADAPTATION_SECONDS)
+            delta = value - self.mean
+            low = self.baseline_mean * (1.0 - self.MAX_SESSION_DRIFT)
+            high = self.baseline_mean * (1.0 + self.MAX_SESSION_DRIFT)
+            self.mean = min(max(self.mean + alpha * delta, low), high)
+            variance = (1 - alpha) * (self.variance() + alpha * delta * delta)
+            self.m2 = variance * (self.min_samples - 1)
+            self.count += 1
+
+        self.unsaved += 1
+        if self.is_calibrated() and self.unsaved >= self.SAVE_EVERY:
+            self.save()
+
+    def threshold(self):
+        """Closed-eye EAR threshold: THRESHOLD_STDDEVS below the open-eye mean, kept within range."""
+        low, high = self.THRESHOLD_RANGE
+        return min(max(self.mean - self.THRESHOLD_STDDEVS * self.stddev(), self.mean * low), self.mean * high)
@@ -0,0 +1,105 @@
+import time
+from threading import Condition, Thread
+
+import cv2
+
+
+class CaptureConfig:
+    """Camera device and the format to request from the driver.
+
+    width/height/fps of None keep the driver default; fourcc is e.g. "MJPG" or "YUYV".
+    """
+
+    def __init__(self, device=2, width=None, height=None, fps=None, fourcc=None):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+
+    def open(self):
+        """Open the device and apply the requested format (FOURCC first, as V4L2 expects)."""
+        cap = cv2.VideoCapture(self.device)
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        return cap
+
+
+class LatestFrameCapture:
+    """Read a camera on its own thread and keep only the newest frame.
+
+    The processing side always gets the freshest frame, so latency stays bounded
+    however slow detection is; frames it never saw are counted as dropped.
+    """
+
+    MIN_BACKOFF = 0.01
+    MAX_BACKOFF = 1.0
+
+    def __init__(self, config=None):
+        self.config = config if config is not None else CaptureConfig()
+        self.frame = None
+        self.frame_id = 0
+        self.last_read_id = 0
+        self.dropped_frames = 0
+        self.failed_reads = 0
+        self.is_running = False
+        self.condition = Condition()
+        self.thread = None
+
+    def start(self):
+        """Open the camera and start the capture thread."""
+        self.is_running = True
+        self.thread = Thread(target=self.capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def capture_loop(self):
+        cap = self.config.open()
+        backoff = self.MIN_BACKOFF
+        try:
+            while self.is_running:
+                ret, frame = cap.read()
+                if not ret:
+                    self.failed_reads += 1
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.MAX_BACKOFF)
+                    continue
+                backoff = self.MIN_BACKOFF
+                with self.condition:
+                    self.frame = frame
+                    self.frame_id += 1
+                    self.condition.notify()
+        finally:
+            cap.release()
+            with self.condition:
+                self.condition.notify_all()
+
+    def read(self, timeout=1.0):
+        """Wait for a frame newer than the last one read.
+
+        Returns (frame, dropped) where dropped is the number of frames skipped since
+        the previous read, or (None, 0) if no new frame arrived within the timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.frame_id != self.last_read_id or not self.is_running, timeout
+            ) or self.frame_id == self.last_read_id:
+                return None, 0
+            dropped = self.frame_id - self.last_read_id - 1
+            self.last_read_id = self.frame_id
+            self.dropped_frames += dropped
+            return self.frame, dropped
+
+    def stop(self):
+        """Stop the capture thread and release the camera."""
+        self.is_running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
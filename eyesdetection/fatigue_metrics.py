@@ -0,0 +1,186 @@
+import os
+
+import numpy as np
+
+
+class FatigueMetrics:
+    """Sliding-window PERCLOS, blink rate and blink duration from fixed-size ring buffers.
+
+    Frames are counted into per-second buckets covering the PERCLOS window, with
+    running totals updated as buckets expire; blinks are kept in a ring of
+    (end time, duration) with a running duration sum. Every update and query is O(1)
+    amortized and memory does not grow with session length.
+
+    Coverage counts only buckets that actually received frames, and a gap longer
+    than MAX_GAP_SECONDS (the user was away) starts a fresh window, so a handful of
+    frames after an absence never count as a fully observed window.
+    """
+
+    PERCLOS_WINDOW = 180.0
+    MAX_GAP_SECONDS = 30.0
+    BLINK_WINDOW = 60.0
+    BUCKET_SECONDS = 1.0
+    MAX_BLINKS = 512
+
+    def __init__(self, perclos_window=PERCLOS_WINDOW, blink_window=BLINK_WINDOW,
+                 bucket_seconds=BUCKET_SECONDS, max_blinks=MAX_BLINKS, max_gap_seconds=MAX_GAP_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.max_gap_buckets = max(1, int(round(max_gap_seconds / bucket_seconds)))
+        self.bucket_count = max(1, int(round(perclos_window / bucket_seconds)))
+        self.frame_counts = np.zeros(self.bucket_count, dtype=np.int64)
+        self.closed_counts = np.zeros(self.bucket_count, dtype=np.int64)
+        self.total_frames = 0
+        self.total_closed = 0
+        self.observed_buckets = 0
+        self.last_bucket = None
+
+        self.blink_window = blink_window
+        self.blink_ends = np.zeros(max_blinks, dtype=np.float64)
+        self.blink_durations = np.zeros(max_blinks, dtype=np.float64)
+        self.blink_head = 0
+        self.blink_size = 0
+        self.blink_duration_sum = 0.0
+
+    def clear_window(self):
+        """Forget every bucket of the PERCLOS window."""
+        self.frame_counts[:] = 0
+        self.closed_counts[:] = 0
+        self.total_frames = 0
+        self.total_closed = 0
+        self.observed_buckets = 0
+
+    def advance(self, bucket):
+        """Expire the buckets between the last seen bucket and `bucket`."""
+        if self.last_bucket is None:
+            self.last_bucket = bucket
+            return
+        if bucket <= self.last_bucket:
+            return
+        if bucket - self.last_bucket > self.max_gap_buckets:
+            self.clear_window()
+            self.last_bucket = bucket
+            return
+        for expired in range(self.last_bucket + 1, min(bucket, self.last_bucket + self.bucket_count) + 1):
+            slot = expired % self.bucket_count
+            if self.frame_counts[slot]:
+                self.observed_buckets -= 1
+            self.total_frames -= self.frame_counts[slot]
+            self.total_closed -= self.closed_counts[slot]
+            self.frame_counts[slot] = 0
+            self.closed_counts[slot] = 0
+        self.last_bucket = bucket
+
+    def add_frame(self, timestamp, closed):
+        """Count one processed frame and whether the eyes were closed in it."""
+        bucket = int(timestamp // self.bucket_seconds)
+        self.advance(bucket)
+        slot = bucket % self.bucket_count
+        if not self.frame_counts[slot]:
+            self.observed_buckets += 1
+        self.frame_counts[slot] += 1
+        self.total_frames += 1
+        if closed:
+            self.closed_counts[slot] += 1
+            self.total_closed += 1
+
+    def add_blink(self, end_time, duration):
+        """Record a completed blink."""
+        capacity = len(self.blink_ends)
+        if self.blink_size == capacity:
+            self.drop_oldest_blink()
+        index = (self.blink_head + self.blink_size) % capacity
+        self.blink_ends[index] = end_time
+        self.blink_durations[index] = duration
+        self.blink_duration_sum += duration
+        self.blink_size += 1
+
+    def drop_oldest_blink(self):
+        self.blink_duration_sum -= self.blink_durations[self.blink_head]
+        self.blink_head = (self.blink_head + 1) % len(self.blink_ends)
+        self.blink_size -= 1
+
+    def expire_blinks(self, now):
+        while self.blink_size and self.blink_ends[self.blink_head] < now - self.blink_window:
+            self.drop_oldest_blink()
+        if self.blink_size == 0:
+            self.blink_duration_sum = 0.0
+
+    def covered_seconds(self):
+        """Seconds of the PERCLOS window that actually contain frames."""
+        return self.observed_buckets * self.bucket_seconds
+
+    def perclos(self, now=None):
+        """Fraction of frames with closed eyes over the PERCLOS window."""
+        if now is not None:
+            self.advance(int(now // self.bucket_seconds))
+        if self.total_frames == 0:
+            return 0.0
+        return self.total_closed / self.total_frames
+
+    def blinks_per_minute(self, now):
+        self.expire_blinks(now)
+        return self.blink_size * 60.0 / self.blink_window
+
+    def mean_blink_duration(self, now):
+        self.expire_blinks(now)
+        if self.blink_size == 0:
+            return 0.0
+        return self.blink_duration_sum / self.blink_size
+
+    def snapshot(self, now):
+        """All metrics at `now`, for the UI and reports."""
+        return {
+            "perclos": self.perclos(now),
+            "blinks_per_minute": self.blinks_per_minute(now),
+            "mean_blink_duration": self.mean_blink_duration(now),
+            "window_seconds": self.covered_seconds(),
+        }
+
+
+class EarHistory:
+    """Bounded per-frame EAR history in a memory-mapped ring file.
+
+    The file holds a small header (next write index, record count) followed by a
+    fixed number of records, so a full day's timeline lives on disk, not in RAM.
+    """
+
+    PATH = "data/ear_history.bin"
+    CAPACITY = 24 * 3600 * 30
+    RECORD = np.dtype([("time", "<f8"), ("ear", "<f4"), ("smoothed_ear", "<f4"), ("closed", "u1")])
+    HEADER = np.dtype("<i8")
+    HEADER_SIZE = 2
+
+    def __init__(self, path=PATH, capacity=CAPACITY):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header_bytes = self.HEADER_SIZE * self.HEADER.itemsize
+        expected_size = header_bytes + capacity * self.RECORD.itemsize
+        if not os.path.exists(path) or os.path.getsize(path) != expected_size:
+            with open(path, "wb") as f:
+                f.truncate(expected_size)
+        self.header = np.memmap(path, dtype=self.HEADER, mode="r+", shape=(self.HEADER_SIZE,))
+        self.records = np.memmap(path, dtype=self.RECORD, mode="r+", offset=header_bytes, shape=(capacity,))
+        self.capacity = capacity
+
+    def append(self, timestamp, ear, smoothed_ear, closed):
+        index = int(self.header[0])
+        self.records[index] = (timestamp, ear, smoothed_ear, closed)
+        self.header[0] = (index + 1) % self.capacity
+        self.header[1] = min(int(self.header[1]) + 1, self.capacity)
+
+    def read(self, since=None):
+        """Return the stored records in time order, optionally only those at or after `since`."""
+        index, count = int(self.header[0]), int(self.header[1])
+        if count < self.capacity:
+            records = np.array(self.records[:count])
+        else:
+            records = np.concatenate((self.records[index:], self.records[:index]))
+        if since is not None:
+            records = records[records["time"] >= since]
+        return records
+
+    def flush(self):
+        self.header.flush()
+        self.records.flush()
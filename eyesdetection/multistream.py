@@ -0,0 +1,307 @@
+"""Run capture and fatigue detection for several cameras in worker processes.
+
+Each stream gets a capture process and a detection process. Grayscale frames move
+between them through a SharedFrameRing in multiprocessing.shared_memory (no pickling
+or pipe copies); only small status messages travel back to the UI process, where a
+thread hands them to the callback. FatigueDetection keeps its state at class level,
+so every detection process owns exactly one stream.
+"""
+import math
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from threading import Thread
+
+import numpy as np
+
+from eyesdetection.capture import CaptureConfig
+from telemetry.stats import Stats
+
+
+class SharedFrameRing:
+    """Single-writer ring of fixed-size uint8 frames in shared memory.
+
+    The header holds the sequence number of the newest frame followed by one sequence
+    number per slot. The writer marks a slot -1 while filling it (a per-slot seqlock),
+    so a reader that raced with the writer notices and retries.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = (1 + slots) * 8
+        frame_bytes = math.prod(self.shape)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.header = np.ndarray((1 + slots,), dtype=np.int64, buffer=self.memory.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.memory.buf,
+                                 offset=header_bytes)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def write(self, frame):
+        sequence = int(self.header[0]) + 1
+        slot = sequence % self.slots
+        self.header[1 + slot] = -1
+        self.frames[slot][...] = frame
+        self.header[1 + slot] = sequence
+        self.header[0] = sequence
+
+    def read_latest(self, last_sequence, out):
+        """Copy the newest frame into `out` if it is newer than last_sequence.
+
+        Returns (sequence, dropped) or (None, 0) when there is nothing new.
+        """
+        for _ in range(3):
+            sequence = int(self.header[0])
+            if sequence == last_sequence:
+                return None, 0
+            slot = sequence % self.slots
+            out[...] = self.frames[slot]
+            if int(self.header[1 + slot]) == sequence:
+                return sequence, max(0, sequence - last_sequence - 1)
+        return None, 0
+
+    def close(self):
+        del self.header, self.frames
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class StreamConfig:
+    """One camera stream: capture settings, calibration profile and detection settings
+    (spawned workers do not see class attributes set in this process).
+
+    The shared frames have the camera's real size, read with a probe before the workers
+    start. max_width/max_height optionally bound it; the aspect ratio is always kept,
+    since squashing a frame changes the EAR.
+
+    stats_enabled turns on telemetry.Stats in the detection worker (it cannot follow a
+    later Stats.enable() in this process); its stage timings and counters are merged
+    into this process's Stats. The EAR timeline goes to ear_history_path, by default
+    data/ear_history-<profile>.bin. Without a profile_name, MultiStreamEngine names the
+    profile <login>-stream<N>.
+    """
+
+    def __init__(self, capture_config=None, max_width=None, max_height=None, profile_name=None, alerts=True,
+                 detection_scale=1.0, auto_tune_scale=False, backend=None, stats_enabled=None,
+                 ear_history_path=None):
+        self.capture_config = capture_config if capture_config is not None else CaptureConfig()
+        self.max_width = max_width
+        self.max_height = max_height
+        self.profile_name = profile_name
+        self.alerts = alerts
+        self.detection_scale = detection_scale
+        self.auto_tune_scale = auto_tune_scale
+        self.backend = backend
+        self.stats_enabled = Stats.enabled if stats_enabled is None else stats_enabled
+        self.ear_history_path = ear_history_path
+
+    def frame_shape(self):
+        """(height, width) of the shared frames: the probed camera size, scaled down to fit
+        max_width/max_height without changing its aspect ratio."""
+        height, width = probe_frame_shape(self.capture_config)
+        scale = min(1.0, (self.max_width or width) / width, (self.max_height or height) / height)
+        return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def probe_frame_shape(capture_config, attempts=10):
+    """Open the camera with its requested format and return the (height, width) it delivers.
+
+    Falls back to CAP_PROP_FRAME_WIDTH/HEIGHT when no frame can be read, then to 480x640.
+    """
+    import cv2
+
+    cap = capture_config.open()
+    try:
+        for _ in range(attempts):
+            ret, frame = cap.read()
+            if ret:
+                return frame.shape[:2]
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    if width > 0 and height > 0:
+        return height, width
+    print(f"Could not read the frame size of camera {capture_config.device}; assuming 640x480")
+    return 480, 640
+
+
+def fit_frame(gray_frame, shape):
+    """Scale a frame into `shape` keeping its aspect ratio; any margin is left black."""
+    import cv2
+
+    scale = min(shape[0] / gray_frame.shape[0], shape[1] / gray_frame.shape[1])
+    size = (max(1, int(gray_frame.shape[1] * scale)), max(1, int(gray_frame.shape[0] * scale)))
+    resized = cv2.resize(gray_frame, size, interpolation=cv2.INTER_AREA)
+    fitted = np.zeros(shape, dtype=np.uint8)
+    fitted[:resized.shape[0], :resized.shape[1]] = resized
+    return fitted
+
+
+def capture_worker(capture_config, ring_name, shape, slots, stop_event):
+    """Read the camera, convert to gray, fit it to the ring's size and publish into shared memory."""
+    import cv2
+
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    cap = capture_config.open()
+    backoff = 0.01
+    try:
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 1.0)
+                continue
+            backoff = 0.01
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if gray_frame.shape != shape:
+                gray_frame = fit_frame(gray_frame, shape)
+            ring.write(gray_frame)
+    finally:
+        cap.release()
+        ring.close()
+
+
+def detection_worker(stream_id, stream, ring_name, shape, slots, results, stop_event, stats_interval=5.0):
+    """Run FatigueDetection on the newest shared frame and send status changes back.
+
+    Every stats_interval it also sends the detection metrics and the Stats drained
+    since the last message.
+    """
+    from eyesdetection.calibration import CalibrationProfile
+    from eyesdetection.FatigueDetection import FatigueDetection
+    from eyesdetection.fatigue_metrics import EarHistory
+
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    gray_frame = np.empty(shape, dtype=np.uint8)
+    if stream.stats_enabled:
+        Stats.enable()
+    FatigueDetection.alerts_enabled = stream.alerts
+    FatigueDetection.DETECTION_SCALE = stream.detection_scale
+    FatigueDetection.AUTO_TUNE_SCALE = stream.auto_tune_scale
+    if stream.backend is not None:
+        FatigueDetection.use_backend(stream.backend)
+    FatigueDetection.load_calibration(stream.profile_name)
+    FatigueDetection.ear_history = EarHistory(
+        stream.ear_history_path
+        or f"data/ear_history-{CalibrationProfile.file_name(FatigueDetection.profile_name)}.bin"
+    )
+    FatigueDetection.load_models()
+
+    last_status = None
+    last_sequence = 0
+    processed = dropped_total = 0
+    next_stats = time.monotonic() + stats_interval
+
+    def publish(status):
+        nonlocal last_status
+        if status != last_status:
+            last_status = status
+            results.put(("status", stream_id, status))
+
+    try:
+        while not stop_event.is_set():
+            sequence, dropped = ring.read_latest(last_sequence, gray_frame)
+            if sequence is None:
+                time.sleep(0.002)
+                continue
+            last_sequence = sequence
+            dropped_total += dropped
+            Stats.increment("frames_dropped", dropped)
+            with Stats.timer("frame"):
+                FatigueDetection.process_frame(gray_frame, publish)
+            Stats.increment("frames_processed")
+            processed += 1
+            if time.monotonic() >= next_stats:
+                next_stats += stats_interval
+                stats = FatigueDetection.fatigue_snapshot()
+                stats.update(frames_processed=processed, frames_dropped=dropped_total, telemetry=Stats.drain())
+                results.put(("stats", stream_id, stats))
+    finally:
+        FatigueDetection.calibration.save()
+        FatigueDetection.ear_history.flush()
+        ring.close()
+
+
+class MultiStreamEngine:
+    """Capture and detect on any number of camera streams in worker processes."""
+
+    RING_SLOTS = 4
+
+    def __init__(self, streams):
+        from eyesdetection.calibration import CalibrationProfile
+
+        self.streams = [stream if isinstance(stream, StreamConfig) else StreamConfig(stream) for stream in streams]
+        # Streams without a profile get their own, so they never share one calibration file.
+        login = CalibrationProfile.default_name()
+        for stream_id, stream in enumerate(self.streams):
+            if stream.profile_name is None:
+                stream.profile_name = f"{login}-stream{stream_id}"
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.results = self.context.Queue()
+        self.processes = []
+        self.rings = []
+        self.stats = {}
+        self.results_thread = None
+        self.is_running = False
+
+    def start(self, callback):
+        """Start all workers; callback(stream_id, status) is called from a thread in this process."""
+        self.is_running = True
+        for stream_id, stream in enumerate(self.streams):
+            shape = stream.frame_shape()
+            ring = SharedFrameRing(shape, self.RING_SLOTS)
+            self.rings.append(ring)
+            self.processes.append(self.context.Process(
+                target=capture_worker,
+                args=(stream.capture_config, ring.name, shape, self.RING_SLOTS, self.stop_event),
+                daemon=True,
+            ))
+            self.processes.append(self.context.Process(
+                target=detection_worker,
+                args=(stream_id, stream, ring.name, shape, self.RING_SLOTS, self.results, self.stop_event),
+                daemon=True,
+            ))
+        for process in self.processes:
+            process.start()
+        self.results_thread = Thread(target=self.results_loop, args=(callback,), daemon=True)
+        self.results_thread.start()
+        return self
+
+    def results_loop(self, callback):
+        while self.is_running:
+            try:
+                kind, stream_id, payload = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if kind == "status":
+                callback(stream_id, payload)
+            elif kind == "stats":
+                Stats.merge(*payload.pop("telemetry"))
+                self.stats[stream_id] = payload
+
+    def stop(self):
+        """Stop every worker and release the shared memory."""
+        self.is_running = False
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+        for ring in self.rings:
+            ring.close()
+        self.processes = []
+        self.rings = []
@@ -0,0 +1,254 @@
+"""Replay recorded footage through FatigueDetection and save the per-frame time series.
+
+Run from the repository root:
+
+    python -m eyesdetection.replay footage.mp4 --out footage.csv --workers 4
+    python -m eyesdetection.replay frames_dir/ --out frames.npz
+    python -m eyesdetection.replay footage.mp4 --out footage.csv --compare dnn
+
+Face detection and landmarks (the expensive part) are measured in parallel
+chunks; the cheap smoothing/calibration/fatigue state machine then runs over
+the merged EARs in frame order, so the result matches a single sequential run.
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from eyesdetection.backends import BACKENDS
+from eyesdetection.FatigueDetection import FatigueDetection
+from eyesdetection.ring_buffer import RollingMean
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+NO_FACE = "No Face"
+
+
+def list_frame_files(directory):
+    """Return the image files of a frame directory in name order."""
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def count_frames(source):
+    """Return the number of frames in a video file or frame directory.
+
+    Videos are counted by grabbing every frame: CAP_PROP_FRAME_COUNT is only the
+    container's estimate and can be short, which would drop frames from parallel runs.
+    """
+    if os.path.isdir(source):
+        return len(list_frame_files(source))
+    cap = cv2.VideoCapture(source)
+    total = 0
+    while cap.grab():
+        total += 1
+    cap.release()
+    return total
+
+
+def frame_rate(source, default=30.0):
+    """Frames per second of a video file; frame directories use `default`."""
+    if os.path.isdir(source):
+        return default
+    cap = cv2.VideoCapture(source)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps if fps and fps > 0 else default
+
+
+def read_gray_frames(source, start=0, stop=None):
+    """Yield grayscale frames [start, stop) from a video file or frame directory.
+
+    An unreadable image in a frame directory yields None, so frame indices stay aligned.
+    """
+    if os.path.isdir(source):
+        for path in list_frame_files(source)[start:stop]:
+            frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if frame is None:
+                print(f"Could not read frame {path}")
+            yield frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    while stop is None or index < stop:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        index += 1
+    cap.release()
+
+
+def measure_chunk(source, start, stop, backend=None):
+    """Measure the EARs of frames [start, stop); one list of face EARs per frame."""
+    if backend is not None and (backend != FatigueDetection.BACKEND or not FatigueDetection.backend_chosen):
+        FatigueDetection.use_backend(backend)
+    FatigueDetection.reset_tracking()
+    return [
+        FatigueDetection.measure_ear(gray_frame) if gray_frame is not None else []
+        for gray_frame in read_gray_frames(source, start, stop)
+    ]
+
+
+def measure_all(source, workers=1, chunk_size=1800, backend=None):
+    """Measure every frame, splitting the recording across a process pool when workers > 1."""
+    total = count_frames(source)
+    if workers <= 1 or total == 0:
+        return measure_chunk(source, 0, None, backend)
+
+    # The last chunk reads to the end, so nothing past the count is ever dropped.
+    bounds = [(start, start + chunk_size) for start in range(0, total, chunk_size)]
+    bounds[-1] = (bounds[-1][0], None)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(measure_chunk, source, start, stop, backend) for start, stop in bounds]
+        frame_ears = []
+        for future in futures:
+            frame_ears.extend(future.result())
+    return frame_ears
+
+
+DETECTOR_STATE = (
+    "blink_count", "consecutive_closed_frames", "closed_since", "metrics", "calibration",
+    "calibrated_ear_threshold", "smoothed_ear_values", "tracker", "frames_since_detection",
+    "ear_history", "alerts_enabled",
+)
+
+
+def score(frame_ears, fps=30.0):
+    """Run the fatigue state machine over measured EARs, exactly as process_frame would.
+
+    The detector's state (including the loaded calibration profile) is restored afterwards.
+    """
+    saved_state = {name: getattr(FatigueDetection, name) for name in DETECTOR_STATE}
+    # reset() clears the smoothing buffer in place; give it a fresh one to clear instead.
+    FatigueDetection.smoothed_ear_values = RollingMean(len(saved_state["smoothed_ear_values"].values))
+    FatigueDetection.reset()
+    FatigueDetection.ear_history = None
+    FatigueDetection.alerts_enabled = False
+
+    count = len(frame_ears)
+    series = {
+        "frame": np.arange(count),
+        "ear": np.full(count, np.nan),
+        "smoothed_ear": np.full(count, np.nan),
+        "state": np.empty(count, dtype=object),
+        "blink_count": np.zeros(count, dtype=np.int64),
+        "perclos": np.zeros(count),
+        "blinks_per_minute": np.zeros(count),
+    }
+    state = NO_FACE
+    try:
+        for index, ears in enumerate(frame_ears):
+            frame_state = NO_FACE
+            timestamp = index / fps
+            for ear in ears:
+                status = FatigueDetection.update_state(ear, timestamp)
+                if status is not None:
+                    state = status
+                series["ear"][index] = ear
+                series["smoothed_ear"][index] = FatigueDetection.smoothed_ear_values.mean()
+                frame_state = state
+                if status == "Calibrating":
+                    break
+            series["state"][index] = frame_state
+            series["blink_count"][index] = FatigueDetection.blink_count
+            series["perclos"][index] = FatigueDetection.metrics.perclos(timestamp)
+            series["blinks_per_minute"][index] = FatigueDetection.metrics.blinks_per_minute(timestamp)
+    finally:
+        for name, value in saved_state.items():
+            setattr(FatigueDetection, name, value)
+    return series
+
+
+def save_series(series, path):
+    """Write the time series to CSV or NPZ depending on the file extension."""
+    if path.lower().endswith(".npz"):
+        np.savez_compressed(path, **{key: values.astype(str) if key == "state" else values
+                                     for key, values in series.items()})
+        return
+
+    columns = list(series.keys())
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in zip(*(series[column] for column in columns)):
+            writer.writerow(row)
+
+
+def replay(source, out_path, workers=1, chunk_size=1800, backend=None):
+    """Replay a recording and write its per-frame time series; return the series."""
+    series = score(measure_all(source, workers, chunk_size, backend), frame_rate(source))
+    save_series(series, out_path)
+    return series
+
+
+def compare_backends(source, backends, workers=1, chunk_size=1800):
+    """Replay the recording with each backend; return {backend: (series, measured frames/sec)}.
+
+    Frames/sec covers detection and landmarks only, summed over all workers.
+    """
+    fps = frame_rate(source)
+    results = {}
+    for backend in backends:
+        start = time.perf_counter()
+        frame_ears = measure_all(source, workers, chunk_size, backend)
+        elapsed = time.perf_counter() - start
+        results[backend] = (score(frame_ears, fps), len(frame_ears) / elapsed if elapsed > 0 else float("inf"))
+    return results
+
+
+def print_comparison(results):
+    """Print speed and agreement with the first backend (the reference) for each backend."""
+    reference_name = next(iter(results))
+    reference = results[reference_name][0]
+    print(f"{'backend':<10}{'frames/s':>10}{'face %':>9}{'blinks':>8}{'EAR diff':>10}{'state agree %':>15}")
+    for name, (series, measured_fps) in results.items():
+        frames = max(len(series["frame"]), 1)
+        faces = ~np.isnan(series["ear"])
+        both = faces & ~np.isnan(reference["ear"])
+        ear_diff = np.abs(series["ear"][both] - reference["ear"][both]).mean() if both.any() else float("nan")
+        agreement = np.mean(series["state"] == reference["state"]) * 100 if len(series["state"]) else 0.0
+        blinks = series["blink_count"][-1] if len(series["blink_count"]) else 0
+        print(f"{name:<10}{measured_fps:>10.1f}{faces.sum() / frames * 100:>9.1f}{blinks:>8}"
+              f"{ear_diff:>10.4f}{agreement:>15.1f}")
+    print(f"EAR diff and state agreement are relative to '{reference_name}'.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Video file or directory of frames")
+    parser.add_argument("--out", required=True, help="Output path (.csv or .npz)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to measure frames")
+    parser.add_argument("--chunk-size", type=int, default=1800, help="Frames per worker task")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=None,
+                        help=f"Face/landmark backend (default: {FatigueDetection.BACKEND}, "
+                             f"else {FatigueDetection.FALLBACK_BACKEND} if its model is missing)")
+    parser.add_argument("--compare", default=None,
+                        help="Comma-separated backends to also run and compare against --backend")
+    args = parser.parse_args()
+
+    if args.compare:
+        args.backend = args.backend or FatigueDetection.BACKEND
+        backends = [args.backend] + [name for name in args.compare.split(",") if name != args.backend]
+        results = compare_backends(args.source, backends, args.workers, args.chunk_size)
+        save_series(results[args.backend][0], args.out)
+        print_comparison(results)
+        return
+
+    series = replay(args.source, args.out, args.workers, args.chunk_size, args.backend)
+    faces = np.count_nonzero(~np.isnan(series["ear"]))
+    blinks = series["blink_count"][-1] if len(series["blink_count"]) else 0
+    print(f"Replayed {len(series['frame'])} frames ({faces} with a face), {blinks} blinks -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
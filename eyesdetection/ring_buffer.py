@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class RollingMean:
+    """Fixed-size ring buffer that keeps a running sum, so the mean is O(1) per sample."""
+
+    def __init__(self, size):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def append(self, value):
+        """Add a sample, dropping the oldest one when the buffer is full."""
+        if self.count == len(self.values):
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % len(self.values)
+        if self.index == 0:
+            # Re-sum once per lap so floating-point drift never accumulates.
+            self.total = float(self.values[:self.count].sum())
+
+    def mean(self):
+        """Return the mean of the buffered samples."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def clear(self):
+        """Drop all samples."""
+        self.values[:] = 0.0
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def __len__(self):
+        return self.count
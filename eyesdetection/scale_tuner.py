@@ -0,0 +1,53 @@
+class DetectionScaleTuner:
+    """Pick the smallest detection scale that still finds the face reliably.
+
+    A miss at a reduced scale is confirmed by re-running the detector one scale up on
+    the same frame, so frames without a face do not count against the scale. After
+    `window` confirmed attempts the tuner steps down when the hit rate is at least
+    `min_hit_rate`, and steps back up (and holds for `cooldown` windows) otherwise.
+    """
+
+    SCALES = (1.0, 0.75, 0.5, 0.35, 0.25)
+
+    def __init__(self, scales=SCALES, window=20, min_hit_rate=0.95, cooldown=10):
+        self.scales = tuple(sorted(scales, reverse=True))
+        self.window = window
+        self.min_hit_rate = min_hit_rate
+        self.cooldown = cooldown
+        self.index = 0
+        self.floor = len(self.scales) - 1
+        self.hits = 0
+        self.attempts = 0
+        self.windows_since_backoff = 0
+
+    @property
+    def scale(self):
+        return self.scales[self.index]
+
+    def fallback_scale(self):
+        """Next larger scale used to confirm a miss, or None at full scale."""
+        if self.index == 0:
+            return None
+        return self.scales[self.index - 1]
+
+    def record(self, found):
+        """Record a detection attempt at the current scale; found=None means no face was present."""
+        if found is None:
+            return
+        self.attempts += 1
+        self.hits += int(found)
+        if self.attempts < self.window:
+            return
+
+        hit_rate = self.hits / self.attempts
+        self.hits = 0
+        self.attempts = 0
+        self.windows_since_backoff += 1
+        if hit_rate < self.min_hit_rate and self.index > 0:
+            self.index -= 1
+            self.floor = self.index
+            self.windows_since_backoff = 0
+        elif self.windows_since_backoff >= self.cooldown:
+            self.floor = len(self.scales) - 1
+        if hit_rate >= self.min_hit_rate and self.index < self.floor:
+            self.index += 1
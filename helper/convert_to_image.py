@@ -1,18 +1,201 @@
+"""Prepare exercise images for the client.
+
+Normalizes file names in the source folder (spaces become underscores), then
+resizes every image to the display sizes the client uses and re-encodes it
+(WebP or optimized JPEG) into the output folder on a process pool. A manifest
+of content hashes lets re-runs skip images that have not changed, and outputs
+that no source or configured size produces any more are removed. The client's
+ExerciseImageCache loads these pre-sized files instead of resizing downloads.
+
+    python helper/convert_to_image.py --source images --output images/build
+"""
+import argparse
+import hashlib
+import json
 import os
-folder_path = "images"
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+# The client shows exercises at 60% of its 500x580 window; 2x for high-DPI screens.
+DEFAULT_SIZES = "300x348,600x696"
+MANIFEST_NAME = "manifest.json"
+
+
+def normalize_name(filename):
+    """Replace whitespace with underscores and collapse repeats, keeping the extension."""
+    stem, extension = os.path.splitext(filename.strip())
+    stem = re.sub(r"_+", "_", re.sub(r"\s+", "_", stem))
+    return stem + extension.lower()
+
+
+def normalize_names(folder_path):
+    """Rename files in place to their normalized names; return the image file names."""
+    names = []
+    for filename in sorted(os.listdir(folder_path)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        new_name = normalize_name(filename)
+        if new_name != filename:
+            old_file = os.path.join(folder_path, filename)
+            new_file = os.path.join(folder_path, new_name)
+            if os.path.exists(new_file):
+                print(f"Skipped rename, target exists: {filename} -> {new_name}")
+                new_name = filename
+            else:
+                os.rename(old_file, new_file)
+                print(f"Renamed: {filename} -> {new_name}")
+        names.append(new_name)
+    return names
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_sizes(sizes):
+    return [tuple(int(part) for part in size.lower().split("x")) for size in sizes.split(",") if size]
+
+
+def output_stems(names):
+    """Map each source name to the stem of its outputs.
+
+    The stem is the name without its extension, unless another source shares it
+    (foo.png and foo.jpg); then the extension is kept (foo_png, foo_jpg) so their
+    outputs do not overwrite each other.
+    """
+    stems = {}
+    for name in names:
+        stems.setdefault(os.path.splitext(name)[0], []).append(name)
+    result = {}
+    for stem, sources in stems.items():
+        for name in sources:
+            if len(sources) > 1:
+                print(f"Name collision on '{stem}': writing {name} as {name.replace('.', '_')}")
+                result[name] = name.replace(".", "_")
+            else:
+                result[name] = stem
+    return result
+
+
+def output_names(stem, sizes, image_format):
+    """Return {"WxH": output file name} for one source."""
+    extension = "webp" if image_format == "webp" else "jpg"
+    return {f"{width}x{height}": f"{stem}_{width}x{height}.{extension}" for width, height in sizes}
+
+
+def process_image(source_path, output_dir, stem, sizes, image_format, quality):
+    """Resize one image to every size and encode it; return {"WxH": output file name}."""
+    from PIL import Image
+
+    outputs = output_names(stem, sizes, image_format)
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        for width, height in sizes:
+            resized = image.resize((width, height), Image.LANCZOS)
+            path = os.path.join(output_dir, outputs[f"{width}x{height}"])
+            if image_format == "webp":
+                resized.save(path, format="WEBP", quality=quality, method=6)
+            else:
+                resized.save(path, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return outputs
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"images": {}}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def is_up_to_date(entry, content_hash, settings, outputs, output_dir):
+    return (
+        entry is not None
+        and entry.get("hash") == content_hash
+        and entry.get("settings") == settings
+        and entry.get("outputs") == outputs
+        and all(os.path.exists(os.path.join(output_dir, name)) for name in outputs.values())
+    )
+
+
+def build(source_dir, output_dir, sizes, image_format="webp", quality=80, workers=None):
+    """Process new or changed images and update the manifest; return (processed, skipped)."""
+    os.makedirs(output_dir, exist_ok=True)
+    names = normalize_names(source_dir)
+    manifest = load_manifest(output_dir)
+    previous = manifest.get("images", {})
+    settings = {"sizes": [f"{w}x{h}" for w, h in sizes], "format": image_format, "quality": quality}
+
+    stems = output_stems(names)
+    images = {}
+    pending = {}
+    for name in names:
+        content_hash = file_hash(os.path.join(source_dir, name))
+        outputs = output_names(stems[name], sizes, image_format)
+        if is_up_to_date(previous.get(name), content_hash, settings, outputs, output_dir):
+            images[name] = previous[name]
+        else:
+            pending[name] = content_hash
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(process_image, os.path.join(source_dir, name), output_dir, stems[name], sizes,
+                              image_format, quality)
+            for name in pending
+        }
+        for name, future in futures.items():
+            try:
+                outputs = future.result()
+            except Exception as e:
+                print(f"Failed to process {name}: {e}")
+                continue
+            images[name] = {"hash": pending[name], "settings": settings, "outputs": outputs}
+            print(f"Processed: {name}")
 
+    # Prune outputs of removed sources, of sizes no longer configured and of renamed stems.
+    current = {output for entry in images.values() for output in entry["outputs"].values()}
+    for entry in previous.values():
+        for output in entry.get("outputs", {}).values():
+            path = os.path.join(output_dir, output)
+            if output not in current and os.path.exists(path):
+                os.remove(path)
 
-for filename in os.listdir(folder_path):
+    save_manifest(output_dir, {"images": images})
+    return len(pending), len(names) - len(pending)
 
-    if " " in filename:
 
-        new_name = filename.replace(" ", "_")
+def main():
+    parser = argparse.ArgumentParser(description="Prepare exercise images for the client.")
+    parser.add_argument("--source", default="images", help="Folder with the original images")
+    parser.add_argument("--output", default=os.path.join("images", "build"), help="Folder for processed images")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated WxH display sizes")
+    parser.add_argument("--format", choices=["webp", "jpeg"], default="webp")
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--rename-only", action="store_true", help="Only normalize file names")
+    args = parser.parse_args()
 
-        old_file = os.path.join(folder_path, filename)
-        new_file = os.path.join(folder_path, new_name)
+    if args.rename_only:
+        normalize_names(args.source)
+        print("All files renamed successfully!")
+        return
 
-        os.rename(old_file, new_file)
-        print(f"Renamed: {filename} -> {new_name}")
+    processed, skipped = build(args.source, args.output, parse_sizes(args.sizes), args.format, args.quality,
+                               args.workers)
+    print(f"Processed {processed} images, {skipped} unchanged.")
 
-print("All files renamed successfully!")
 
+if __name__ == "__main__":
+    main()
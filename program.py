@@ -1,5 +1,99 @@
-from counter.counter import Counter
+import argparse
 
 if __name__ == "__main__":
-    counter = Counter()
-    counter.run()
+    parser = argparse.ArgumentParser(description="Work/rest timer with fatigue detection and usage tracking.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the Tk UI (timer, tracking and detection only)")
+    parser.add_argument("--work-minutes", type=int, default=50, help="Work phase length in headless mode")
+    parser.add_argument("--rest-minutes", type=int, default=10, help="Rest phase length in headless mode")
+    parser.add_argument("--no-tracking", action="store_true", help="Headless mode: do not track windows")
+    parser.add_argument("--no-detection", action="store_true", help="Headless mode: do not run fatigue detection")
+    parser.add_argument("--camera", type=int, default=None, help="Camera device index (default 2)")
+    parser.add_argument("--resolution", default=None, help="Capture resolution, e.g. 640x480")
+    parser.add_argument("--fps", type=int, default=None, help="Capture frame rate")
+    parser.add_argument("--fourcc", choices=["MJPG", "YUYV"], default=None, help="Capture pixel format")
+    parser.add_argument("--detection-scale", default=None,
+                        help="Downscale factor for face search (e.g. 0.5), or 'auto' to tune it")
+    parser.add_argument("--face-backend", choices=["dlib", "dnn"], default=None,
+                        help="Face detector (dnn: OpenCV YuNet, the default, falling back to dlib while its "
+                             "model is missing; dlib: HOG), both with the 68-point eye landmarks; see "
+                             "eyesdetection/backends.py for model downloads")
+    parser.add_argument("--detection-processes", action="store_true",
+                        help="Run capture and detection in worker processes with shared-memory frames")
+    parser.add_argument("--cameras", default=None,
+                        help="Headless mode: comma-separated camera indexes to watch at once, e.g. 0,2")
+    parser.add_argument("--profile", default=None, help="Calibration profile name (default: login name)")
+    parser.add_argument("--stats-port", type=int, default=None,
+                        help="Serve /stats (JSON) and /metrics (Prometheus) on this localhost port")
+    parser.add_argument("--stats-file", default=None,
+                        help="Periodically dump stats to this file (.json, otherwise Prometheus text)")
+    args = parser.parse_args()
+
+    if args.stats_port is not None:
+        from telemetry.export import StatsServer
+
+        StatsServer(args.stats_port).start()
+    if args.stats_file is not None:
+        from telemetry.export import StatsDumper
+
+        StatsDumper(args.stats_file).start()
+
+    detection_options = (args.camera, args.resolution, args.fps, args.fourcc, args.detection_scale,
+                         args.profile, args.face_backend)
+    if args.detection_processes or any(value is not None for value in detection_options):
+        from eyesdetection.capture import CaptureConfig
+        from eyesdetection.FatigueDetection import FatigueDetection
+
+        width, height = map(int, args.resolution.lower().split("x")) if args.resolution else (None, None)
+        FatigueDetection.capture_config = CaptureConfig(
+            device=args.camera if args.camera is not None else 2,
+            width=width,
+            height=height,
+            fps=args.fps,
+            fourcc=args.fourcc,
+        )
+        if args.detection_scale == "auto":
+            FatigueDetection.AUTO_TUNE_SCALE = True
+        elif args.detection_scale is not None:
+            FatigueDetection.DETECTION_SCALE = float(args.detection_scale)
+        if args.profile is not None:
+            FatigueDetection.profile_name = args.profile
+        FatigueDetection.USE_PROCESSES = args.detection_processes
+        if args.face_backend is not None:
+            FatigueDetection.use_backend(args.face_backend)
+
+    streams = None
+    if args.cameras:
+        from eyesdetection.calibration import CalibrationProfile
+        from eyesdetection.capture import CaptureConfig
+        from eyesdetection.multistream import StreamConfig
+
+        width, height = map(int, args.resolution.lower().split("x")) if args.resolution else (None, None)
+        profile = args.profile or CalibrationProfile.default_name()
+        detection_scale = float(args.detection_scale) if args.detection_scale not in (None, "auto") else 1.0
+        streams = [
+            StreamConfig(
+                CaptureConfig(device=int(device), width=width, height=height, fps=args.fps, fourcc=args.fourcc),
+                profile_name=f"{profile}-camera{int(device)}",
+                detection_scale=detection_scale,
+                auto_tune_scale=args.detection_scale == "auto",
+                backend=args.face_backend,
+            )
+            for device in args.cameras.split(",")
+        ]
+
+    if args.headless:
+        from counter.daemon import HeadlessSession
+
+        HeadlessSession(
+            args.work_minutes * 60,
+            args.rest_minutes * 60,
+            track_windows=not args.no_tracking,
+            detect_fatigue=not args.no_detection,
+            streams=streams,
+        ).run()
+    else:
+        from counter.counter import Counter
+
+        counter = Counter()
+        counter.run()
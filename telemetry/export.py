@@ -0,0 +1,99 @@
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+
+from telemetry.stats import Stats
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+    """GET /stats returns JSON, GET /metrics returns Prometheus text.
+
+    POST /enable and POST /disable switch collection on and off at runtime.
+    """
+
+    def do_POST(self):
+        if self.path == "/enable":
+            Stats.enable()
+        elif self.path == "/disable":
+            Stats.disable()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(204)
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.startswith("/stats"):
+            body = json.dumps(Stats.snapshot(), indent=2).encode()
+            content_type = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = Stats.prometheus_text().encode()
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StatsServer:
+    """Local HTTP endpoint for the stats; binds to localhost only."""
+
+    def __init__(self, port=9464, host="127.0.0.1"):
+        self.server = ThreadingHTTPServer((host, port), StatsRequestHandler)
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        Stats.enable()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StatsDumper:
+    """Periodically write the stats to a file (JSON for *.json, else Prometheus text-file format)."""
+
+    def __init__(self, path, interval=15.0):
+        self.path = path
+        self.interval = interval
+        self.stop_event = Event()
+        self.thread = Thread(target=self.dump_loop, daemon=True)
+
+    def start(self):
+        Stats.enable()
+        self.thread.start()
+        return self
+
+    def dump(self):
+        if self.path.endswith(".json"):
+            content = json.dumps(Stats.snapshot(), indent=2)
+        else:
+            content = Stats.prometheus_text()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(content)
+        os.replace(temp_path, self.path)
+
+    def dump_loop(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.dump()
+            except OSError as e:
+                print(f"Could not write stats file: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        self.dump()
@@ -0,0 +1,196 @@
+import math
+import time
+from contextlib import nullcontext
+from threading import Lock
+
+
+class Histogram:
+    """Fixed log-spaced latency histogram (1 µs to ~100 s, ~12% bucket width)."""
+
+    MIN_SECONDS = 1e-6
+    FACTOR = 1.12
+    BUCKETS = 164
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = min(self.BUCKETS - 1, int(math.log(seconds / self.MIN_SECONDS, self.FACTOR)) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Add another histogram's samples to this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th quantile (0 < q <= 1)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.FACTOR ** index, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class StageTimer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        Stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Stats:
+    """Process-wide per-stage timings and event counters, off unless enabled.
+
+    While disabled, timer() returns a shared no-op context manager and increment()
+    returns immediately, so instrumented hot paths cost a single attribute check.
+    """
+
+    enabled = False
+    histograms = {}
+    counters = {}
+    lock = Lock()
+    started_at = time.time()
+    NULL_TIMER = nullcontext()
+
+    @staticmethod
+    def enable():
+        Stats.enabled = True
+
+    @staticmethod
+    def disable():
+        Stats.enabled = False
+
+    @staticmethod
+    def reset():
+        with Stats.lock:
+            Stats.histograms = {}
+            Stats.counters = {}
+            Stats.started_at = time.time()
+
+    @staticmethod
+    def timer(name):
+        """Context manager timing one execution of a stage."""
+        if not Stats.enabled:
+            return Stats.NULL_TIMER
+        return StageTimer(name)
+
+    @staticmethod
+    def record(name, seconds):
+        if not Stats.enabled:
+            return
+        with Stats.lock:
+            histogram = Stats.histograms.get(name)
+            if histogram is None:
+                histogram = Stats.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    @staticmethod
+    def increment(name, amount=1):
+        if not Stats.enabled:
+            return
+        with Stats.lock:
+            Stats.counters[name] = Stats.counters.get(name, 0) + amount
+
+    @staticmethod
+    def drain():
+        """Return (histograms, counters) collected since the last drain and start afresh.
+
+        Worker processes drain their stats and send them to the main process, which adds
+        them to its own with merge().
+        """
+        with Stats.lock:
+            histograms, counters = Stats.histograms, Stats.counters
+            Stats.histograms = {}
+            Stats.counters = {}
+        return histograms, counters
+
+    @staticmethod
+    def merge(histograms, counters):
+        """Add stats drained in another process to this process's stats."""
+        if not Stats.enabled:
+            return
+        with Stats.lock:
+            for name, other in histograms.items():
+                histogram = Stats.histograms.get(name)
+                if histogram is None:
+                    histogram = Stats.histograms[name] = Histogram()
+                histogram.merge(other)
+            for name, amount in counters.items():
+                Stats.counters[name] = Stats.counters.get(name, 0) + amount
+
+    @staticmethod
+    def snapshot():
+        """All stage summaries, counters and derived rates as a JSON-ready dict."""
+        with Stats.lock:
+            stages = {name: histogram.summary() for name, histogram in Stats.histograms.items()}
+            counters = dict(Stats.counters)
+        derived = {}
+        if counters.get("detector_runs"):
+            derived["detector_hit_rate"] = counters.get("detector_hits", 0) / counters["detector_runs"]
+        frames = counters.get("frames_processed", 0) + counters.get("frames_dropped", 0)
+        if frames:
+            derived["frame_drop_rate"] = counters.get("frames_dropped", 0) / frames
+        return {
+            "enabled": Stats.enabled,
+            "uptime_seconds": time.time() - Stats.started_at,
+            "stages": stages,
+            "counters": counters,
+            "derived": derived,
+        }
+
+    @staticmethod
+    def prometheus_text(prefix="health"):
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot = Stats.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, summary in sorted(snapshot["stages"].items()):
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {summary[key]:.9f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {summary["sum"]:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        lines.append(f"# HELP {prefix}_events_total Counted pipeline events.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for event, value in sorted(snapshot["counters"].items()):
+            lines.append(f'{prefix}_events_total{{event="{event}"}} {value}')
+        lines.append(f"# TYPE {prefix}_ratio gauge")
+        for name, value in sorted(snapshot["derived"].items()):
+            lines.append(f'{prefix}_ratio{{name="{name}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,56 @@
+import time
+from threading import Event
+
+from audio.dispatcher import AudioDispatcher, RecordingBackend
+
+
+class GatedRecordingBackend(RecordingBackend):
+    """Records like RecordingBackend, but each play waits until the gate opens."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = Event()
+
+    def play(self, name):
+        self.gate.wait(5)
+        super().play(name)
+
+
+def wait_for_plays(backend, count):
+    deadline = time.monotonic() + 5
+    while len(backend.played) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return [name for _, name in backend.played]
+
+
+def test_queued_warning_is_not_queued_twice():
+    backend = GatedRecordingBackend()
+    dispatcher = AudioDispatcher(backend, min_intervals={})
+    try:
+        assert dispatcher.play("warning")
+        assert not dispatcher.play("warning")
+        assert dispatcher.play("rest")
+        backend.gate.set()
+        assert wait_for_plays(backend, 2) == ["warning", "rest"]
+        assert dispatcher.play("warning")
+        assert wait_for_plays(backend, 3) == ["warning", "rest", "warning"]
+    finally:
+        backend.gate.set()
+        dispatcher.close()
+    assert (dispatcher.requested, dispatcher.suppressed) == (4, 1)
+
+
+def test_warning_is_rate_limited():
+    backend = RecordingBackend()
+    dispatcher = AudioDispatcher(backend, min_intervals={"warning": 10.0})
+    try:
+        assert dispatcher.play("warning")
+        assert wait_for_plays(backend, 1) == ["warning"]
+        assert not dispatcher.play("warning")
+        assert dispatcher.play("work")
+        dispatcher.last_played["warning"] -= 10.0
+        assert dispatcher.play("warning")
+        assert wait_for_plays(backend, 3) == ["warning", "work", "warning"]
+    finally:
+        dispatcher.close()
+    assert dispatcher.suppressed == 1
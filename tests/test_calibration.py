@@ -0,0 +1,20 @@
+import getpass
+import os
+
+from eyesdetection.calibration import CalibrationProfile
+
+
+def test_profile_names_stay_inside_the_profile_directory(tmp_path):
+    directory = str(tmp_path / "profiles")
+    for name in ("../x", "DOMAIN\\user", "a b/c", ".."):
+        path = CalibrationProfile(name, directory=directory).path
+        assert os.path.dirname(path) == directory
+    assert CalibrationProfile("DOMAIN\\user", directory=directory).path == os.path.join(directory, "DOMAIN_user.json")
+
+
+def test_default_name_falls_back_without_a_login_name(monkeypatch):
+    def no_user():
+        raise KeyError("getpwuid(): uid not found")
+
+    monkeypatch.setattr(getpass, "getuser", no_user)
+    assert CalibrationProfile.default_name() == CalibrationProfile.DEFAULT_NAME
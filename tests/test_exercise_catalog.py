@@ -0,0 +1,94 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+
+import pytest
+
+from counter.execrise import Exercise, ExerciseCatalog
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves /api/v1/exercises/random with a new numbered set on every request."""
+
+    requests_served = 0
+    delay = 0.0
+
+    def do_GET(self):
+        if self.path != "/api/v1/exercises/random":
+            self.send_error(404)
+            return
+        time.sleep(StandInHandler.delay)
+        StandInHandler.requests_served += 1
+        body = json.dumps([{"id": StandInHandler.requests_served, "name": "Stretch", "description": "", "image": ""}])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    StandInHandler.requests_served = 0
+    StandInHandler.delay = 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Exercise, "base_api", f"http://127.0.0.1:{httpd.server_port}/api/v1/exercises")
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def wait_for_list(catalog):
+    arrived = Event()
+    received = []
+    catalog.add_listener(lambda items: (received.append(items), arrived.set()))
+    return arrived, received
+
+
+def test_empty_cache_notifies_listener_when_fetch_completes(server, tmp_path):
+    catalog = ExerciseCatalog(cache_path=str(tmp_path / "exercises.json"))
+    arrived, received = wait_for_list(catalog)
+    assert catalog.exercises() == []
+    assert arrived.wait(5)
+    assert received[0][0]["id"] == 1
+    assert catalog.items == received[0]
+    assert ExerciseCatalog(cache_path=str(tmp_path / "exercises.json")).items == received[0]
+
+
+def test_slow_backend_serves_cached_list_immediately(server, tmp_path):
+    cache_path = str(tmp_path / "exercises.json")
+    catalog = ExerciseCatalog(cache_path=cache_path)
+    catalog.save_to_disk([{"id": 0, "name": "Cached"}], time.time() - 2 * ExerciseCatalog.TTL_SECONDS)
+    catalog = ExerciseCatalog(cache_path=cache_path)
+    arrived, received = wait_for_list(catalog)
+    StandInHandler.delay = 1.0
+
+    start = time.perf_counter()
+    assert catalog.exercises() == [{"id": 0, "name": "Cached"}]
+    assert time.perf_counter() - start < 0.5
+    assert arrived.wait(5)
+    assert catalog.exercises()[0]["id"] == 1
+
+
+def test_forced_prefetch_fetches_a_new_random_set(server, tmp_path):
+    catalog = ExerciseCatalog(cache_path=str(tmp_path / "exercises.json"))
+    for expected_id in (1, 2):
+        arrived, received = wait_for_list(catalog)
+        catalog.prefetch(force=True)
+        assert arrived.wait(5)
+        catalog.fetch_thread.join(5)
+        assert catalog.exercises()[0]["id"] == expected_id
+    assert StandInHandler.requests_served == 2
+
+
+def test_backend_down_keeps_previous_list(monkeypatch, tmp_path):
+    monkeypatch.setattr(Exercise, "base_api", "http://127.0.0.1:9/api/v1/exercises")
+    catalog = ExerciseCatalog(cache_path=str(tmp_path / "exercises.json"))
+    catalog.items = [{"id": 0, "name": "Cached"}]
+    catalog.refresh()
+    assert catalog.items == [{"id": 0, "name": "Cached"}]
@@ -0,0 +1,68 @@
+import pytest
+
+from eyesdetection.FatigueDetection import FatigueDetection
+
+FPS = 30.0
+OPEN_EAR = 0.30
+CLOSED_EAR = 0.10
+
+
+@pytest.fixture(autouse=True)
+def detector():
+    alerts_enabled, ear_history = FatigueDetection.alerts_enabled, FatigueDetection.ear_history
+    FatigueDetection.alerts_enabled = False
+    FatigueDetection.ear_history = None
+    FatigueDetection.reset()
+    yield FatigueDetection
+    FatigueDetection.reset()
+    FatigueDetection.alerts_enabled = alerts_enabled
+    FatigueDetection.ear_history = ear_history
+
+
+def feed(ears, start):
+    """Feed EARs at FPS from `start`; return (statuses, time after the last frame)."""
+    statuses = [FatigueDetection.update_state(ear, start + index / FPS) for index, ear in enumerate(ears)]
+    return statuses, start + len(ears) / FPS
+
+
+def calibrate(start=0.0):
+    ears = [OPEN_EAR + (0.005 if index % 2 else -0.005) for index in range(FatigueDetection.CALIBRATION_FRAMES)]
+    statuses, now = feed(ears, start)
+    assert statuses[-1] == "Calibrating"
+    assert FatigueDetection.calibration.is_calibrated()
+    return now
+
+
+def test_absence_then_blink_is_not_drowsy():
+    now = calibrate()
+    _, now = feed([OPEN_EAR] * int(300 * FPS), now)
+    now += 600.0
+    drowsy = []
+    for index, ear in enumerate([OPEN_EAR] * 3 + [CLOSED_EAR] * 8 + [OPEN_EAR] * 40):
+        timestamp = now + index / FPS
+        status = FatigueDetection.update_state(ear, timestamp)
+        drowsy.append(FatigueDetection.is_drowsy(timestamp))
+        if index < 3 + 8:
+            assert status != "Tired"
+    assert not any(drowsy)
+    assert FatigueDetection.metrics.covered_seconds() < FatigueDetection.PERCLOS_MIN_SECONDS
+
+
+def test_sustained_high_perclos_is_tired():
+    now = calibrate()
+    # 20% of frames closed in short runs (below TIRED_CLOSED_FRAMES) for two minutes.
+    pattern = [OPEN_EAR] * 40 + [CLOSED_EAR] * 12
+    statuses, _ = feed(pattern * int(120 * FPS / len(pattern)), now)
+    assert "Tired" in statuses
+
+
+def test_slow_droop_is_still_detected():
+    now = calibrate()
+    calibrated_threshold = FatigueDetection.calibrated_ear_threshold
+    frames = int(180 * FPS)
+    droop = [OPEN_EAR - (OPEN_EAR - 0.21) * index / frames for index in range(frames)]
+    statuses, _ = feed(droop, now)
+    assert "Tired" in statuses
+    assert FatigueDetection.calibrated_ear_threshold >= calibrated_threshold * (
+        1.0 - FatigueDetection.calibration.MAX_SESSION_DRIFT
+    )
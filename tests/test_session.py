@@ -0,0 +1,15 @@
+from counter.session import SessionEngine, VirtualClock
+
+
+def test_full_session_from_non_integer_start():
+    ticks = []
+    phases = []
+    clock = VirtualClock(0.1)
+    engine = SessionEngine(1500, 300, clock=clock, on_tick=ticks.append, on_phase_change=phases.append)
+    engine.start()
+    engine.simulate(1800)
+    assert clock.now() == 1800.1
+    assert engine.completed_phases == 2
+    assert phases == [SessionEngine.WORK, SessionEngine.REST, SessionEngine.WORK]
+    assert len(ticks) == 1800 - 2
+    assert ticks[0] == 1499
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from eyesdetection.multistream import SharedFrameRing
+
+SHAPE = (4, 6)
+
+
+def frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    yield ring
+    ring.close()
+
+
+def test_read_latest_returns_each_new_frame_once(ring):
+    out = np.empty(SHAPE, dtype=np.uint8)
+    assert ring.read_latest(0, out) == (None, 0)
+    ring.write(frame(1))
+    assert ring.read_latest(0, out) == (1, 0)
+    assert (out == 1).all()
+    assert ring.read_latest(1, out) == (None, 0)
+
+
+def test_reader_in_another_mapping_counts_dropped_frames(ring):
+    reader = SharedFrameRing(SHAPE, slots=4, name=ring.name)
+    try:
+        out = np.empty(SHAPE, dtype=np.uint8)
+        for value in range(1, 7):
+            ring.write(frame(value))
+        assert reader.read_latest(0, out) == (6, 5)
+        assert (out == 6).all()
+        ring.write(frame(7))
+        assert reader.read_latest(6, out) == (7, 0)
+    finally:
+        reader.close()
+
+
+class RacingOut:
+    """Destination whose first copy is overtaken by the writer lapping the ring."""
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.data = np.empty(SHAPE, dtype=np.uint8)
+        self.raced = False
+
+    def __setitem__(self, key, value):
+        if not self.raced:
+            self.raced = True
+            for value_written in range(10, 10 + self.ring.slots):
+                self.ring.write(frame(value_written))
+        self.data[key] = value
+
+
+def test_read_retries_when_a_write_overtakes_the_copy(ring):
+    ring.write(frame(1))
+    out = RacingOut(ring)
+    sequence, dropped = ring.read_latest(0, out)
+    assert (sequence, dropped) == (5, 4)
+    assert (out.data == 13).all()
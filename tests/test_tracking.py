@@ -0,0 +1,44 @@
+from threading import Event
+
+import pytest
+
+from counter.program_controll import ProgramController
+from counter.usage_aggregate import UsageAggregator
+from counter.usage_store import UsageStore
+from counter.window_backends import SyntheticBackend
+
+SWITCHES = [
+    (0.0, "Editor", "main.py"),
+    (90.0, "Browser", "Docs"),
+    (150.0, "Editor", "main.py"),
+    (150.0, "Editor", "main.py"),
+    (400.0, "Terminal", ""),
+]
+
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch):
+    store = UsageStore(str(tmp_path / "usage.db"))
+    for name, value in (("store", store), ("backend", None), ("active_window", None), ("start_time", None),
+                        ("stop_event", Event()), ("usage_log", UsageAggregator()), ("wall_anchor", None),
+                        ("fatigue_status", None), ("fatigue_since", None)):
+        monkeypatch.setattr(ProgramController, name, value)
+    yield ProgramController
+    store.close()
+
+
+def test_synthetic_switches_are_stored_as_intervals(controller):
+    controller.track_active_window(SyntheticBackend(SWITCHES, start=1000.0, end=430.0))
+    controller.stop_tracking()
+
+    intervals = controller.store.intervals()
+    anchor_wall, anchor_clock = controller.wall_anchor
+    offset = anchor_wall - anchor_clock
+    stored = [(round(start - offset, 6), round(end - offset, 6), app, title) for start, end, app, title in intervals]
+    assert stored == [
+        (1000.0, 1090.0, "Editor", "main.py"),
+        (1090.0, 1150.0, "Browser", "Docs"),
+        (1150.0, 1400.0, "Editor", "main.py"),
+        (1400.0, 1430.0, "Terminal", ""),
+    ]
+    assert controller.usage_log.app_totals() == pytest.approx({"Editor": 340.0, "Browser": 60.0, "Terminal": 30.0})
@@ -0,0 +1,75 @@
+from collections import Counter
+from threading import Thread
+
+import numpy as np
+import pytest
+
+from counter.usage_aggregate import SpaceSaving, UsageAggregator
+
+
+def weighted_stream(count=5000, keys=200, seed=0):
+    rng = np.random.default_rng(seed)
+    titles = rng.zipf(1.4, count) % keys
+    weights = rng.exponential(30.0, count)
+    return [(f"Document {title}", float(weight)) for title, weight in zip(titles, weights)]
+
+
+def test_space_saving_bounds_hold_for_kept_and_dropped_keys():
+    stream = weighted_stream()
+    truth = Counter()
+    sketch = SpaceSaving(10)
+    for key, weight in stream:
+        truth[key] += weight
+        sketch.add(key, weight)
+
+    assert sketch.total == pytest.approx(sum(truth.values()))
+    kept = {key: (count, error) for key, count, error in sketch.top()}
+    assert len(kept) == 10
+    for key, (count, error) in kept.items():
+        assert count - error <= truth[key] + 1e-6
+        assert truth[key] <= count + 1e-6
+    for key in truth.keys() - kept.keys():
+        assert truth[key] <= sketch.min_count() + 1e-6
+
+
+def test_aggregator_summary_bounds_and_exact_app_totals():
+    stream = weighted_stream(seed=1)
+    truth = Counter()
+    aggregator = UsageAggregator(titles_per_app=10)
+    for title, weight in stream:
+        truth[title] += weight
+        aggregator.add("Editor", title, weight)
+
+    assert aggregator.app_totals()["Editor"] == pytest.approx(sum(truth.values()))
+    kept, other, error_bound = aggregator.summary("Editor")
+    for title, seconds, error in kept:
+        assert seconds <= truth[title] + 1e-6
+        assert truth[title] <= seconds + error + 1e-6
+    folded = truth.keys() - {title for title, _, _ in kept}
+    assert all(truth[title] <= error_bound + 1e-6 for title in folded)
+    assert sum(seconds for _, seconds, _ in kept) + other == pytest.approx(sum(truth.values()))
+
+
+def test_reads_while_tracking_adds():
+    aggregator = UsageAggregator(titles_per_app=5)
+    errors = []
+
+    def add():
+        for index in range(20000):
+            aggregator.add(f"App {index % 7}", f"Title {index % 50}", 1.0)
+
+    def read():
+        try:
+            for _ in range(500):
+                aggregator.flat(10)
+                aggregator.app_totals()
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [Thread(target=add), Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert sum(aggregator.app_totals().values()) == 20000.0
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from counter.window_backends import X11Backend
+
+
+class FakeWindow:
+    def __init__(self, window_id):
+        self.id = window_id
+        self.event_mask = None
+
+    def change_attributes(self, event_mask):
+        self.event_mask = event_mask
+
+
+def fake_x11_backend():
+    backend = X11Backend.__new__(X11Backend)
+    backend.X = SimpleNamespace(NoEventMask=0, PropertyChangeMask=1 << 22)
+    backend.XError = OSError
+    backend.root = FakeWindow(1)
+    backend.active_window = None
+    return backend
+
+
+def test_x11_follow_unsubscribes_the_previous_window():
+    backend = fake_x11_backend()
+    editor, terminal = FakeWindow(2), FakeWindow(3)
+    backend.follow(editor)
+    assert editor.event_mask == backend.X.PropertyChangeMask
+    backend.follow(terminal)
+    assert editor.event_mask == backend.X.NoEventMask
+    assert terminal.event_mask == backend.X.PropertyChangeMask
+    assert backend.is_watched(backend.root)
+    assert backend.is_watched(terminal)
+    assert not backend.is_watched(editor)